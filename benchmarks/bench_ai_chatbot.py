@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+"""End-to-end benchmark of handle_ai_chatbot_message against a local mock OpenRouter.
+
+Drives the real handler -> queue -> scheduler -> LLM client -> session store
+path with synthetic Discord objects. Reports latency percentiles, event-loop
+blocking, bytes per request and throughput as JSON.
+
+Usage: python benchmarks/bench_ai_chatbot.py --users 50 --messages 5 --latency 0.3 --error-rate 0.05
+       python benchmarks/bench_ai_chatbot.py --models 2 --model-delays 3,0.2  (slow primary: hedges fire)
+"""
+
+# Imports
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import discord
+from aiohttp import web
+
+import ai_chatbot
+import ai_streaming
+from ai_backends import LLMBackend
+from http_client import HTTPClientRegistry
+from rate_limiter import RateLimiter, RatePolicy
+
+AI_CHANNEL_ID = 1371926833511006218
+LOGGING_CHANNEL_ID = 1
+BOT_USER_ID = 1000
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def latency_summary(values):
+    """p50/p95/p99/max in milliseconds"""
+    return {
+        "p50_ms": round(percentile(values, 0.5) * 1000, 2) if values else None,
+        "p95_ms": round(percentile(values, 0.95) * 1000, 2) if values else None,
+        "p99_ms": round(percentile(values, 0.99) * 1000, 2) if values else None,
+        "max_ms": round(max(values) * 1000, 2) if values else None
+    }
+
+
+# Mock OpenRouter
+
+class MockOpenRouter:
+    """Chat completions endpoint with configurable (per model) latency and error injection"""
+
+    def __init__(self, latency, jitter, error_rate, error_status, model_delays=None):
+        self.latency = latency
+        self.model_delays = model_delays or {}  # model -> latency, overrides `latency`
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+        self.request_bytes = []
+        self.runner = None
+        self.url = None
+
+    async def handle(self, request):
+        body = await request.read()
+        self.requests += 1
+        self.request_bytes.append(len(body))
+        payload = json.loads(body)
+        latency = self.model_delays.get(payload.get("model"), self.latency)
+        await asyncio.sleep(max(0.0, latency * random.uniform(1 - self.jitter, 1 + self.jitter)))
+
+        if random.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=self.error_status, text="injected error")
+
+        content = "sure thing. here's a totally made up answer for the benchmark, nothing to see here ^^"
+        if payload.get("stream"):
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await response.prepare(request)
+            for word in content.split(' '):
+                chunk = {"choices": [{"delta": {"content": word + ' '}}]}
+                await response.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            await response.write(b"data: [DONE]\n\n")
+            return response
+        return web.json_response({"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/chat/completions', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/chat/completions"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+# Synthetic Discord objects
+
+_snowflakes = itertools.count(discord.utils.time_snowflake(discord.utils.utcnow()))
+
+
+class FakeUser:
+    def __init__(self, user_id, name):
+        self.id = user_id
+        self.name = name
+        self.display_name = name
+        self.bot = False
+        self.mention = f"<@{user_id}>"
+        self.display_avatar = types.SimpleNamespace(url="https://cdn.discordapp.com/embed/avatars/0.png")
+
+
+class FakeTyping:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeChannel:
+    def __init__(self, channel_id, name, guild):
+        self.id = channel_id
+        self.name = name
+        self.guild = guild
+        self.sent = 0
+
+    def typing(self):
+        return FakeTyping()
+
+    async def send(self, content=None, **kwargs):
+        self.sent += 1
+        return FakeSentMessage(content)
+
+
+class FakeSentMessage:
+    def __init__(self, content):
+        self.id = next(_snowflakes)
+        self.content = content
+        self.edits = 0
+
+    async def edit(self, content=None, **kwargs):
+        self.content = content
+        self.edits += 1
+
+
+class FakeMessage:
+    def __init__(self, author, channel, bot_user, content):
+        self.id = next(_snowflakes)
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.mentions = [bot_user]
+        self.content = f"<@{bot_user.id}> {content}"
+        self.reference = None
+        self.first_reply = asyncio.get_running_loop().create_future()
+        self.completed = asyncio.get_running_loop().create_future()
+
+    async def reply(self, content=None, **kwargs):
+        if not self.first_reply.done():
+            self.first_reply.set_result(time.perf_counter())
+        return FakeSentMessage(content)
+
+
+class FakeBot:
+    """Just enough of commands.Bot for register_ai_chatbot_commands and the handler"""
+
+    def __init__(self):
+        self.user = FakeUser(BOT_USER_ID, "FCKR")
+        self.logging_channel = LOGGING_CHANNEL_ID
+        self.http_clients = HTTPClientRegistry()
+        guild = types.SimpleNamespace(id=2, name="Benchmark Guild")
+        self.channels = {
+            AI_CHANNEL_ID: FakeChannel(AI_CHANNEL_ID, "ai-chat", guild),
+            LOGGING_CHANNEL_ID: FakeChannel(LOGGING_CHANNEL_ID, "bot-logs", guild)
+        }
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_cog(self, name):
+        return None
+
+    def command(self, **kwargs):
+        return lambda func: func
+
+
+# Measurement helpers
+
+class LoopBlockMonitor:
+    """Samples event-loop lag: a sleep that wakes up late means something blocked the loop"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.lags = []
+        self.task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+    def summary(self, threshold=0.01):
+        blocked = [lag for lag in self.lags if lag >= threshold]
+        return {
+            "samples": len(self.lags),
+            "blocked_total_ms": round(sum(blocked) * 1000, 2),
+            "blocks_over_10ms": len(blocked),
+            **latency_summary(self.lags)
+        }
+
+
+def timed(func, durations):
+    """Wrap a synchronous function, recording its on-loop duration"""
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            durations.append(time.perf_counter() - started)
+    return wrapper
+
+
+def redirect_storage(directory):
+    """Point every file the chatbot writes at a scratch directory"""
+    ai_chatbot.LOGS_DIR = directory
+    ai_chatbot.STATS_PATH = os.path.join(directory, 'stats.json')
+    ai_chatbot.SESSIONS_PATH = os.path.join(directory, 'sessions.json')
+    ai_chatbot.SESSIONS_DB = os.path.join(directory, 'sessions.db')
+    ai_chatbot.TIMESERIES_PATH = os.path.join(directory, 'metrics.bin')
+    ai_chatbot.MEMORY_DIR = os.path.join(directory, 'memory')
+    ai_chatbot.QUOTA_PATH = os.path.join(directory, 'quota.json')
+
+
+# Benchmark
+
+async def simulate_user(bot, user, messages, think_time, results):
+    channel = bot.channels[AI_CHANNEL_ID]
+    for i in range(messages):
+        message = FakeMessage(user, channel, bot.user, f"message {i} from {user.name}, what do you think about counting games?")
+        started = time.perf_counter()
+        handled = await ai_chatbot.handle_ai_chatbot_message(bot, message)
+        if not handled:
+            results["rejected"] += 1
+            continue
+        await message.completed
+        results["latency"].append(time.perf_counter() - started)
+        if message.first_reply.done():
+            results["first_reply"].append(message.first_reply.result() - started)
+        if think_time:
+            await asyncio.sleep(random.uniform(0, 2 * think_time))
+
+
+async def run(args):
+    logging.basicConfig(level=logging.WARNING)
+    models = [f"bench/model-{i}" for i in range(args.models)]
+    delays = [float(delay) for delay in args.model_delays.split(',')] if args.model_delays else []
+    mock = MockOpenRouter(args.latency, args.jitter, args.error_rate, args.error_status, dict(zip(models, delays)))
+    await mock.start()
+
+    scratch = tempfile.TemporaryDirectory()
+    redirect_storage(scratch.name)
+
+    bot = FakeBot()
+    ai_chatbot.register_ai_chatbot_commands(bot)
+    client = bot.ai_chatbot_client
+    client.streaming = args.streaming
+    # Same interface a local inference server would get, but OpenRouter's connection pool (it stands in for it)
+    client.backends["mock"] = LLMBackend("mock", mock.url, models=",".join(models), http_profile="openrouter", metered=True)
+    client.default_backend = "mock"
+    # Measure the pipeline, not the provider budget
+    bot.session_manager.rate_limiter = RateLimiter([RatePolicy("bench", 10 ** 9, 1)])
+    bot.session_manager.quota.daily_requests = 10 ** 9  # Metered, so its count can be checked against upstream_calls
+
+    # On-loop cost of the synchronous persistence paths
+    session_writes, stats_saves = [], []
+    bot.session_manager.add_interaction = timed(bot.session_manager.add_interaction, session_writes)
+    ai_chatbot.save_ai_chatbot_stats = timed(ai_chatbot.save_ai_chatbot_stats, stats_saves)
+
+    # Resolve every coalesced message once its batch is answered
+    process_batch = ai_chatbot.process_ai_request_batch
+
+    async def process_and_complete(batch_client, batch):
+        try:
+            await process_batch(batch_client, batch)
+        finally:
+            for message, _ in batch:
+                if not message.completed.done():
+                    message.completed.set_result(None)
+    ai_chatbot.process_ai_request_batch = process_and_complete
+
+    results = {"latency": [], "first_reply": [], "rejected": 0}
+    users = [FakeUser(10_000 + i, f"user{i}") for i in range(args.users)]
+    monitor = LoopBlockMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(simulate_user(bot, user, args.messages, args.think_time, results) for user in users))
+    elapsed = time.perf_counter() - started
+    # Streamed replies finish their last edit in the background, paced per channel
+    pending_final_edits = len(ai_streaming.final_edits)
+    drain_started = time.perf_counter()
+    await asyncio.gather(*ai_streaming.final_edits)
+    final_edits_drain = time.perf_counter() - drain_started
+    await monitor.stop()
+
+    await bot.ai_log_sink.close()
+    await bot.http_clients.close()
+    await asyncio.to_thread(bot.session_manager.close)
+    await mock.stop()
+    scratch.cleanup()
+
+    completed = len(results["latency"])
+    scheduler_stats = bot.ai_scheduler.stats()
+    return {
+        "config": vars(args),
+        "requests": {
+            "sent": args.users * args.messages,
+            "completed": completed,
+            "rejected": results["rejected"],
+            "upstream_calls": mock.requests,
+            "upstream_errors": mock.errors,
+            "quota_metered": bot.session_manager.quota.requests,
+            "shed": scheduler_stats["shed"],
+            "coalesced": bot.ai_request_queue.coalesced
+        },
+        "throughput_rps": round(completed / elapsed, 2) if elapsed else None,
+        "wall_time_s": round(elapsed, 3),
+        "latency": latency_summary(results["latency"]),
+        "first_reply_latency": latency_summary(results["first_reply"]),
+        "streamed_final_edits": {
+            "pending_at_end": pending_final_edits,
+            "drain_s": round(final_edits_drain, 3)
+        },
+        "event_loop": monitor.summary(),
+        "sync_io": {
+            "session_write": latency_summary(session_writes),
+            "stats_save": latency_summary(stats_saves)
+        },
+        "backend": client.backends["mock"].stats(),
+        "models": client.backends["mock"].model_router.stats(),
+        "bytes_per_request": {
+            "avg": round(sum(mock.request_bytes) / len(mock.request_bytes), 1) if mock.request_bytes else None,
+            "max": max(mock.request_bytes) if mock.request_bytes else None,
+            "avg_prompt_tokens": round(client.payload_metrics.avg_tokens, 1)
+        },
+        "log_sink": {
+            "messages": bot.ai_log_sink.sent_messages,
+            "embeds": bot.ai_log_sink.sent_embeds
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20, help="Concurrent synthetic users")
+    parser.add_argument('--messages', type=int, default=5, help="Messages each user sends, one after another")
+    parser.add_argument('--think-time', type=float, default=0.0, help="Average pause (s) between a user's messages")
+    parser.add_argument('--latency', type=float, default=0.2, help="Mock upstream latency (s)")
+    parser.add_argument('--jitter', type=float, default=0.5, help="Relative latency jitter (0.5 = ±50%%)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of upstream calls that fail")
+    parser.add_argument('--error-status', type=int, default=500, help="HTTP status of injected failures")
+    parser.add_argument('--models', type=int, default=1, help="Configured mock models (>1 enables fallback/hedging)")
+    parser.add_argument('--model-delays', help="Comma-separated latency (s) per model, in --models order; the rest use --latency")
+    parser.add_argument('--streaming', action='store_true', help="Use the streamed reply path")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', help="Also write the JSON result to this file")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    result = asyncio.run(run(args))
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the counting rules engine and the offline audit.
+
+Generates a synthetic counting channel (mostly plain numbers, some chatter,
+wrong numbers and double counts that survived), then times the bare
+CountEngine, audit() over in-memory rows, and the full audit of a
+DiscordChatExporter CSV export including parsing.
+
+Usage: python benchmarks/bench_count_audit.py [--messages 2000000] [--error-rate 0.01]
+"""
+
+# Imports
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from count_audit import AuditReport, audit, read_csv
+from count_rules import CountEngine
+
+
+def synthetic_channel(messages, error_rate, seed=1):
+    """(message_id, user_id, is_bot, content, acknowledged) rows, oldest first"""
+    rng = random.Random(seed)
+    rows = []
+    count = 0
+    last_user = None
+    for message_id in range(1, messages + 1):
+        user_id = rng.randrange(1, 200)
+        if rng.random() < error_rate:
+            # A survivor the bot should have removed
+            content = rng.choice(["lol", f"{count + 5}", f"{count} oops"])
+            rows.append((message_id, user_id, False, content, False))
+            continue
+        if user_id == last_user:
+            user_id += 1
+        count += 1
+        last_user = user_id
+        rows.append((message_id, user_id, False, str(count) if rng.random() < 0.9 else f"{count} nice", True))
+    return rows
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["AuthorID", "Author", "Date", "Content", "Attachments", "Reactions"])
+        for _, user_id, _, content, acknowledged in rows:
+            writer.writerow([user_id, f"user{user_id}", "2024-01-01T00:00:00+00:00", content, "", "✅ (1)" if acknowledged else ""])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=2_000_000)
+    parser.add_argument('--error-rate', type=float, default=0.01)
+    args = parser.parse_args()
+
+    rows = synthetic_channel(args.messages, args.error_rate)
+
+    engine = CountEngine()
+    feed = engine.feed
+    started = time.perf_counter()
+    for message_id, user_id, _, content, _ in rows:
+        feed(content, user_id, message_id)
+    elapsed = time.perf_counter() - started
+    print(f"engine only:        {len(rows) / elapsed:>12,.0f} messages/s (final count {engine.count})")
+
+    report = AuditReport(0)
+    started = time.perf_counter()
+    audit(iter(rows), CountEngine(), report)
+    elapsed = time.perf_counter() - started
+    print(f"audit, in memory:   {len(rows) / elapsed:>12,.0f} messages/s ({sum(report.divergences.values()):,} divergences)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'export.csv')
+        write_csv(path, rows)
+        report = AuditReport(0)
+        started = time.perf_counter()
+        audit(read_csv(path), CountEngine(), report)
+        elapsed = time.perf_counter() - started
+        print(f"audit, CSV export:  {len(rows) / elapsed:>12,.0f} messages/s incl. parsing ({os.path.getsize(path) / 2 ** 20:.0f} MB)")
+
+
+if __name__ == '__main__':
+    main()
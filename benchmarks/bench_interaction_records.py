@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Measure RAM per stored interaction: legacy dict + ISO string vs. slotted Interaction.
+
+Usage: python benchmarks/bench_interaction_records.py [users] [ram_mb]
+"""
+
+# Imports
+import collections
+import datetime
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from interaction import Interaction
+
+MAX_HISTORY_LENGTH = 15
+
+
+def texts(i):
+    # Typical sizes: short user message, longer bot reply
+    return f"hey bot, question number {i}: what do you think about this?", f"honestly {i} is a great number. " * 5
+
+
+def legacy_entry(i, now):
+    user_message, bot_response = texts(i)
+    return {
+        "timestamp": datetime.datetime.fromtimestamp(now + i).isoformat(),
+        "user_message": user_message,
+        "bot_response": bot_response,
+        "tokens": [12, 40]
+    }
+
+
+def slotted_entry(i, now):
+    user_message, bot_response = texts(i)
+    return Interaction(now + i, user_message, bot_response, 12, 40)
+
+
+def measure(factory, users):
+    """Bytes allocated per interaction for full per-user histories"""
+    now = int(time.time())
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = {}
+    i = 0
+    for user_id in range(users):
+        history = collections.deque(maxlen=MAX_HISTORY_LENGTH)
+        for _ in range(MAX_HISTORY_LENGTH):
+            history.append(factory(i, now))
+            i += 1
+        sessions[user_id] = history
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / i, sessions
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    ram_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 512
+
+    # The message texts are the same in both layouts, count them separately
+    user_message, bot_response = texts(123456)
+    text_bytes = sys.getsizeof(user_message) + sys.getsizeof(bot_response)
+
+    legacy, _ = measure(legacy_entry, users)
+    slotted, _ = measure(slotted_entry, users)
+
+    print(f"interactions: {users * MAX_HISTORY_LENGTH} ({users} users x {MAX_HISTORY_LENGTH})")
+    print(f"legacy dict + ISO string: {legacy:.0f} B/interaction ({legacy - text_bytes:.0f} B without message texts)")
+    print(f"slotted Interaction:      {slotted:.0f} B/interaction ({slotted - text_bytes:.0f} B without message texts)")
+    print(f"reduction: {1 - slotted / legacy:.1%} total, {1 - (slotted - text_bytes) / (legacy - text_bytes):.1%} of the record overhead")
+    per_user_legacy = legacy * MAX_HISTORY_LENGTH
+    per_user_slotted = slotted * MAX_HISTORY_LENGTH
+    print(f"full histories in {ram_mb} MB: {ram_mb * 2 ** 20 / per_user_legacy:,.0f} users (legacy) vs {ram_mb * 2 ** 20 / per_user_slotted:,.0f} users (slotted)")
+
+
+if __name__ == '__main__':
+    main()
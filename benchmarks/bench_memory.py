@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Benchmark long-term memory retrieval at 1M stored interactions.
+
+The first --ingest interactions go through LongTermMemory.add() to measure
+ingest cost, the rest are bulk-filled with vectors of the same synthetic
+texts. Then top-k searches are timed for a typical user, for one heavy user
+holding --heavy-share of all rows, and for a brute-force scan of every row.
+
+Usage: python benchmarks/bench_memory.py [--interactions 1000000] [--users 10000]
+"""
+
+# Imports
+import argparse
+import array
+import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import numpy as np
+import psutil
+
+from ai_memory import GROW_ROWS, MEMORY_DIM, LongTermMemory
+
+WORDS = (
+    "cat dog mochi tuna rust python factorio minecraft pizza coffee weather rain snow exam school "
+    "work boss deadline music guitar piano anime manga movie netflix server discord bot count "
+    "number game win lose streak birthday cake party trip berlin paris tokyo train bike car"
+).split()
+
+
+def synthetic_text(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 20)))
+
+
+def percentiles(values):
+    ordered = sorted(values)
+    return {
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3)
+    }
+
+
+def time_searches(memory, user_id, queries, k):
+    durations = []
+    for query in queries:
+        started = time.perf_counter()
+        memory.search(user_id, query, k)
+        durations.append(time.perf_counter() - started)
+    return percentiles(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--interactions', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--heavy-share', type=float, default=0.05, help="Share of all rows owned by one heavy user")
+    parser.add_argument('--ingest', type=int, default=20_000, help="Interactions added through add()")
+    parser.add_argument('--searches', type=int, default=200)
+    parser.add_argument('--k', type=int, default=4)
+    parser.add_argument('--dim', type=int, default=MEMORY_DIM)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    scratch = tempfile.TemporaryDirectory()
+    memory = LongTermMemory(scratch.name, args.dim)
+    timestamp = datetime.datetime.now().isoformat()
+    heavy_user = 1
+
+    def pick_user():
+        return heavy_user if rng.random() < args.heavy_share else rng.randint(2, args.users)
+
+    # Ingest through the real write path
+    ingest = min(args.ingest, args.interactions)
+    started = time.perf_counter()
+    for _ in range(ingest):
+        memory.add(pick_user(), {"timestamp": timestamp, "user_message": synthetic_text(rng), "bot_response": synthetic_text(rng)})
+    ingest_seconds = time.perf_counter() - started
+
+    # Bulk-fill the rest with vectors of a pool of synthetic texts
+    pool = np.stack([memory.vectorizer.vectorize(synthetic_text(rng)) for _ in range(4096)]).astype(np.float16)
+    remaining = args.interactions - ingest
+    np_rng = np.random.default_rng(42)
+    while remaining:
+        batch = min(remaining, GROW_ROWS)
+        if memory.count + batch > memory.capacity:
+            memory._resize(memory.capacity + GROW_ROWS * ((batch + GROW_ROWS - 1) // GROW_ROWS))
+        rows = np.arange(memory.count, memory.count + batch)
+        users = np.where(np_rng.random(batch) < args.heavy_share, heavy_user, np_rng.integers(2, args.users + 1, batch))
+        memory.vectors[rows] = pool[np_rng.integers(0, len(pool), batch)]
+        memory.records['user_id'][rows] = users
+        memory.records['timestamp'][rows] = int(time.time())
+        for row, user_id in zip(rows.tolist(), users.tolist()):
+            memory.users.setdefault(user_id, array.array('I')).append(row)
+        memory.count += batch
+        remaining -= batch
+
+    queries = [synthetic_text(rng) for _ in range(args.searches)]
+    typical_user = max(memory.users, key=lambda user_id: 0 if user_id == heavy_user else -abs(len(memory.users[user_id]) - memory.count / args.users))
+
+    # Brute force over every stored row, for comparison
+    all_rows = np.arange(memory.count)
+    scan = []
+    for query in queries[:20]:
+        started = time.perf_counter()
+        scores = memory.scores(all_rows, memory.vectorizer.vectorize(query))
+        np.argpartition(-scores, args.k)[:args.k]
+        scan.append(time.perf_counter() - started)
+
+    result = {
+        "interactions": memory.count,
+        "users": len(memory.users),
+        "dim": args.dim,
+        "ingest_per_second": round(ingest / ingest_seconds, 1) if ingest_seconds else None,
+        "typical_user": {"rows": len(memory.users[typical_user]), **time_searches(memory, typical_user, queries, args.k)},
+        "heavy_user": {"rows": len(memory.users[heavy_user]), **time_searches(memory, heavy_user, queries, args.k)},
+        "full_scan": {"rows": memory.count, **percentiles(scan)},
+        "disk_bytes_per_interaction": round(sum(
+            os.path.getsize(os.path.join(memory.directory, name)) for name in os.listdir(memory.directory)
+        ) / memory.count, 1),
+        "index_heap_bytes_per_interaction": round(sum(sys.getsizeof(rows) for rows in memory.users.values()) / memory.count, 1),
+        "rss_mb": round(psutil.Process().memory_info().rss / 2 ** 20, 1)
+    }
+    memory.close()
+    scratch.cleanup()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the chatbot rate limiter at 100k distinct users.
+
+Usage: python benchmarks/bench_rate_limiter.py [users] [checks]
+"""
+
+# Imports
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from rate_limiter import RateLimiter, RatePolicy
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    checks = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    limiter = RateLimiter([
+        RatePolicy("user_hourly", 25, 3600),
+        RatePolicy("global_daily", 10 ** 9, 86400, per_user=False)
+    ])
+    user_ids = [random.getrandbits(63) for _ in range(users)]
+    stream = [random.choice(user_ids) for _ in range(checks)]
+
+    # Simulated clock: the whole run spans two hours so idle keys get evicted
+    start_clock = 1_700_000_000.0
+    step = 7200 / checks
+
+    started = time.perf_counter()
+    allowed = 0
+    for i, user_id in enumerate(stream):
+        ok, _, _ = limiter.check(user_id, now=start_clock + i * step)
+        allowed += ok
+    elapsed = time.perf_counter() - started
+
+    print(f"users: {users}, checks: {checks}, allowed: {allowed}")
+    print(f"total: {elapsed:.3f}s, per check: {elapsed / checks * 1e6:.2f}µs")
+    print(f"tracked keys after run: {limiter.tracked_keys()}")
+
+
+if __name__ == '__main__':
+    main()
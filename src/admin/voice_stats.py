@@ -137,6 +137,11 @@ class VoiceStatsCog(commands.Cog):
     
     async def get_current_counting_number(self):
         """Get the current counting number from the counting channel"""
+        # The counting cog already knows it, no history fetch needed
+        counting_cog = self.bot.get_cog('CountingCog')
+        if counting_cog and counting_cog.initialized:
+            return counting_cog.current_count
+
         counting_channel_id = int(os.getenv('COUNTING_CHANNEL_ID', 0))
         if not counting_channel_id:
             return 0
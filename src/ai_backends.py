@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import collections
+import logging
+import os
+import urllib.parse
+
+from ai_hedging import AI_MODELS, ModelRouter
+from ai_transport import AI_REQUEST_DEADLINE
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_HEADERS = {
+    "HTTP-Referer": "https://github.com/ninjazan420/FCKR-discord-bot",
+    "X-Title": "Fckr Chan AI Chatbot Discord Bot"
+}
+
+AI_BACKEND = os.getenv('AI_BACKEND', 'openrouter')  # Backend for channels without their own
+AI_BACKENDS = os.getenv('AI_BACKENDS', '')  # Extra backends "local,lab", each configured via AI_BACKEND_<NAME>_*
+AI_CHANNEL_BACKENDS = os.getenv('AI_CHANNEL_BACKENDS', '')  # Per-channel overrides "channel_id:backend,..."
+
+LOOPBACK_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+
+class LLMBackend:
+    """One OpenAI-compatible chat completions service.
+
+    Bundles URL, auth headers, the model list (with its router and circuit
+    breakers), the HTTP pool profile and the backend's own latency and
+    token throughput statistics.
+    """
+
+    def __init__(self, name, url, api_key=None, models=AI_MODELS, extra_headers=None, http_profile=None, deadline=AI_REQUEST_DEADLINE, metered=False):
+        self.name = name
+        self.url = url
+        self.metered = metered  # Counts against the daily provider quota
+        self.headers = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+        if extra_headers:
+            self.headers.update(extra_headers)
+        if http_profile is None:
+            # A server on this host gets its own small pool, not OpenRouter's limits
+            http_profile = "local_llm" if urllib.parse.urlsplit(url).hostname in LOOPBACK_HOSTS else name
+        self.http_profile = http_profile
+        self.deadline = deadline
+        self.model_router = ModelRouter(url, models)
+
+        self.completion_tokens = 0
+        self.generations = collections.deque(maxlen=100)  # (tokens, seconds) of recent completions
+
+    def record_generation(self, tokens, seconds):
+        """Record one finished completion for the throughput stats"""
+        self.completion_tokens += tokens
+        self.generations.append((tokens, seconds))
+
+    def tokens_per_second(self):
+        """Recent completion tokens per second of request time, None without data"""
+        seconds = sum(seconds for _, seconds in self.generations)
+        if not seconds:
+            return None
+        return sum(tokens for tokens, _ in self.generations) / seconds
+
+    def stats(self):
+        latencies = sorted(latency for endpoint in self.model_router.endpoints for latency in endpoint.latencies)
+        return {
+            "name": self.name,
+            "host": urllib.parse.urlsplit(self.url).hostname,
+            "requests": sum(endpoint.requests for endpoint in self.model_router.endpoints),
+            "errors": sum(endpoint.errors for endpoint in self.model_router.endpoints),
+            "cancelled": sum(endpoint.cancelled for endpoint in self.model_router.endpoints),
+            "p50": latencies[int(len(latencies) * 0.5)] if latencies else None,
+            "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_second": self.tokens_per_second()
+        }
+
+
+def load_backends(openrouter_key):
+    """OpenRouter plus every backend listed in AI_BACKENDS, {name: LLMBackend}"""
+    backends = {
+        "openrouter": LLMBackend("openrouter", OPENROUTER_URL, openrouter_key, AI_MODELS, OPENROUTER_HEADERS, http_profile="openrouter", metered=True)
+    }
+    for name in AI_BACKENDS.split(','):
+        name = name.strip().lower()
+        if not name:
+            continue
+        prefix = f"AI_BACKEND_{name.upper()}_"
+        url = os.getenv(prefix + 'URL')
+        if not url:
+            logging.warning(f"AI backend '{name}' has no {prefix}URL, skipping it")
+            continue
+        backends[name] = LLMBackend(
+            name,
+            url,
+            api_key=os.getenv(prefix + 'KEY'),
+            models=os.getenv(prefix + 'MODELS', 'local'),  # Single-model servers usually ignore the name
+            deadline=float(os.getenv(prefix + 'DEADLINE', AI_REQUEST_DEADLINE)),
+            metered=os.getenv(prefix + 'METERED', 'false').lower() in ('1', 'true', 'yes')
+        )
+        logging.info(f"Configured AI backend '{name}' at {url}")
+    return backends
+
+
+def parse_channel_backends(value=AI_CHANNEL_BACKENDS):
+    """"channel_id:backend,..." -> {channel_id: backend}"""
+    channel_backends = {}
+    for entry in value.split(','):
+        channel_id, _, name = entry.partition(':')
+        if channel_id.strip().isdigit() and name.strip():
+            channel_backends[int(channel_id)] = name.strip().lower()
+    return channel_backends
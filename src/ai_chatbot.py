@@ -8,135 +8,174 @@ import datetime
 import random
 import time
 from os.path import join, dirname, abspath
-import collections  # For chat history management
+import asyncio
 
 import discord
 from discord.ext import commands, tasks
 import requests
-import aiohttp
+
+from session_store import SessionStore, load_legacy_sessions
+from bot_message_index import BotMessageIndex
+from ai_streaming import iter_sse_deltas, stream_reply
+from rate_limiter import RateLimiter, RatePolicy
+from token_count import estimate_tokens
+from interaction import Interaction
+from ai_context import CONTEXT_TOKEN_BUDGET, PayloadMetrics, build_context
+from ai_queue import UserRequestQueue
+from ai_backends import AI_BACKEND, load_backends, parse_channel_backends
+from ai_hedging import hedged_request
+from ai_transport import CircuitOpenError, LLMRequestError, is_retryable, post_completion
+from ai_metrics import MetricsTimeSeries, format_latency
+from ai_scheduler import LLMScheduler, PRIORITY_OWNER, PRIORITY_ADMIN, PRIORITY_USER
+from ai_log_sink import InteractionLogSink
+from ai_quota import QuotaGovernor
+from ai_memory import AI_LONG_TERM_MEMORY, MEMORY_RECENT_TURNS, MEMORY_TOP_K, LongTermMemory
 
 # Paths for character data and logs
 CHAR_PATH = join(dirname(dirname(abspath(__file__))), 'data', 'ai_chatbot.json')
 LOGS_DIR = join(dirname(abspath(__file__)), 'ai_chatbot', 'logs')
 STATS_PATH = join(LOGS_DIR, 'stats.json')
-SESSIONS_PATH = join(LOGS_DIR, 'sessions.json')
+SESSIONS_PATH = join(LOGS_DIR, 'sessions.json')  # Legacy snapshot, migrated into SESSIONS_DB
+SESSIONS_DB = join(LOGS_DIR, 'sessions.db')
+MEMORY_DIR = join(LOGS_DIR, 'memory')  # Long-term memory vector index
+TIMESERIES_PATH = join(LOGS_DIR, 'metrics.bin')
+QUOTA_PATH = join(LOGS_DIR, 'quota.json')  # Today's provider request/token counters
+
+# How often (seconds) to stat ai_chatbot.json for persona changes
+CHAR_RELOAD_CHECK_INTERVAL = 5
 
 # Ensure logs directory exists
 os.makedirs(LOGS_DIR, exist_ok=True)
 
 # Configuration for sessions
 MAX_HISTORY_LENGTH = 15  # Number of messages to store per user
+ACTIVE_SESSION_SECONDS = 3600  # A session counts as active this long after the user's last message
+
+# Canned reply while every model's circuit breaker is open (no request is sent)
+CIRCUIT_OPEN_REPLY = "my brain's taking a little nap, openrouter is struggling rn. try again in a minute 🔌"
+
+# Rate limiting: 1000 requests/day provider budget ÷ 40 users = 25/hour per user
+# (the daily budget itself is enforced by the quota governor, which also lowers
+# the per-user limit when the budget is draining too fast)
+USER_HOURLY_LIMIT = 25
 
 # Session Manager for user interactions
 class SessionManager:
     def __init__(self):
-        self.user_sessions = {}  # Stores session data per user
-        self.rate_limits = {}  # Stores rate limit information per user
+        self.store = SessionStore(SESSIONS_DB, MAX_HISTORY_LENGTH)  # Lazy, LRU-bounded session storage
+        self.user_policy = RatePolicy("user_hourly", USER_HOURLY_LIMIT, 3600)
+        self.rate_limiter = RateLimiter([self.user_policy])
+        self.quota = QuotaGovernor(QUOTA_PATH, USER_HOURLY_LIMIT)  # Daily provider budget, persisted
+        # Every past interaction, searched for the ones relevant to a new message
+        self.memory = LongTermMemory(MEMORY_DIR) if AI_LONG_TERM_MEMORY else None
+
+    @property
+    def active_sessions(self):
+        """Users who chatted within the last ACTIVE_SESSION_SECONDS"""
+        return self.store.active_count(int(time.time()) - ACTIVE_SESSION_SECONDS)
+
+    async def get_user_context(self, user_id, prompt=None):
+        """Returns stored context for a user.
 
-    def get_user_context(self, user_id):
-        """Returns stored context for a user"""
-        if user_id not in self.user_sessions:
-            self.user_sessions[user_id] = collections.deque(maxlen=MAX_HISTORY_LENGTH)
-        return list(self.user_sessions[user_id])
+        With a prompt and long-term memory enabled, that's a constant-size mix:
+        the newest few turns plus the most relevant older exchanges, oldest first.
+        The search scores every stored row of the user, so it runs in a worker thread.
+        """
+        history = list(self.store.get_history(user_id))
+        if self.memory is None or not prompt:
+            return history
+        recent = history[-MEMORY_RECENT_TURNS:] if MEMORY_RECENT_TURNS > 0 else []
+        relevant = await asyncio.to_thread(self.memory.search, user_id, prompt, MEMORY_TOP_K, len(recent))
+        return relevant + recent
 
     def add_interaction(self, user_id, prompt, response):
         """Stores a new interaction in user context"""
-        if user_id not in self.user_sessions:
-            self.user_sessions[user_id] = collections.deque(maxlen=MAX_HISTORY_LENGTH)
-
-        self.user_sessions[user_id].append({
-            "timestamp": datetime.datetime.now().isoformat(),
-            "user_message": prompt,
-            "bot_response": response
-        })
+        entry = Interaction(int(time.time()), prompt, response, estimate_tokens(prompt), estimate_tokens(response))
         
-        # Save sessions periodically
-        self.save_sessions()
+        # Written to disk by the store's background writer
+        self.store.append(user_id, entry)
+        if self.memory is not None:
+            self.memory.add(user_id, entry)
 
     def load_sessions(self):
-        """Load user sessions from file"""
-        try:
-            if os.path.exists(SESSIONS_PATH):
-                with open(SESSIONS_PATH, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for user_id, sessions in data.items():
-                        self.user_sessions[int(user_id)] = collections.deque(
-                            sessions, maxlen=MAX_HISTORY_LENGTH
-                        )
-                logging.info(f"Loaded {len(self.user_sessions)} user sessions")
-        except Exception as e:
-            logging.error(f"Error loading sessions: {str(e)}")
+        """Migrate the legacy sessions.json (+ journal) into the session database once"""
+        legacy_files = [path for path in (SESSIONS_PATH, SESSIONS_PATH + '.journal', SESSIONS_PATH + '.journal.compacting') if os.path.exists(path)]
+        if not legacy_files:
+            logging.info(f"Session store ready with {self.store.user_count()} users")
+        else:
+            try:
+                sessions = load_legacy_sessions(SESSIONS_PATH, MAX_HISTORY_LENGTH)
+                self.store.import_sessions(sessions)
+                for path in legacy_files:
+                    os.replace(path, path + '.migrated')
+                logging.info(f"Migrated {len(sessions)} user sessions into {SESSIONS_DB}")
+            except Exception as e:
+                logging.error(f"Error migrating sessions: {str(e)}")
 
-    def save_sessions(self):
-        """Save user sessions to file"""
-        try:
-            # Convert deques to lists for JSON serialization
-            sessions_data = {}
-            for user_id, sessions in self.user_sessions.items():
-                sessions_data[str(user_id)] = list(sessions)
-            
-            with open(SESSIONS_PATH, 'w', encoding='utf-8') as f:
-                json.dump(sessions_data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logging.error(f"Error saving sessions: {str(e)}")
+        # A new memory index starts with whatever the session store still has
+        if self.memory is not None and self.memory.count == 0 and self.store.user_count():
+            try:
+                imported = self.memory.import_entries(self.store.all_interactions())
+                logging.info(f"Backfilled long-term memory with {imported} interactions")
+            except Exception as e:
+                logging.error(f"Error backfilling long-term memory: {str(e)}")
+
+    def close(self):
+        """Flush pending interactions to disk and stop the store writer"""
+        self.store.close()
+        if self.memory is not None:
+            self.memory.close()
 
     def get_user_stats(self, user_id):
-        """Get statistics for a specific user"""
-        if user_id not in self.user_sessions:
-            return {"total_messages": 0, "first_interaction": None, "last_interaction": None}
-        
-        sessions = list(self.user_sessions[user_id])
-        if not sessions:
+        """Get statistics for a specific user (from the summary index, no history needed)"""
+        summary = self.store.get_summary(user_id)
+        if not summary:
             return {"total_messages": 0, "first_interaction": None, "last_interaction": None}
         
         return {
-            "total_messages": len(sessions),
-            "first_interaction": sessions[0]["timestamp"],
-            "last_interaction": sessions[-1]["timestamp"]
+            "total_messages": summary[0],
+            "first_interaction": summary[1],
+            "last_interaction": summary[2]
         }
 
-    def check_rate_limit(self, user_id, client=None):
+    def check_rate_limit(self, user_id, client=None, metered=True):
         """Checks if a user has exceeded rate limits"""
         # Check if user is blocked for ButterIQ
         if client and hasattr(client, 'butteriq_manager'):
             if client.butteriq_manager.is_disabled(user_id):
                 return False, 0
 
-        # Rate limiting: 25 requests per hour per user (1000 requests/day ÷ 40 users = 25/hour)
-        current_time = time.time()
-        
-        if user_id not in self.rate_limits:
-            self.rate_limits[user_id] = []
-        
-        # Clean old timestamps (older than 1 hour)
-        hour_ago = current_time - 3600  # 3600 seconds = 1 hour
-        self.rate_limits[user_id] = [timestamp for timestamp in self.rate_limits[user_id] if timestamp > hour_ago]
-        
-        # Check if user has exceeded limit
-        if len(self.rate_limits[user_id]) >= 25:
-            # Calculate time until next request is allowed
-            oldest_request = min(self.rate_limits[user_id])
-            time_until_reset = int((oldest_request + 3600) - current_time)
-            return False, time_until_reset
-        
-        # Add current timestamp
-        self.rate_limits[user_id].append(current_time)
-        return True, 0
+        # Daily provider budget first, so a denied request doesn't use up the user's hourly allowance
+        if metered:
+            self.quota.update(self.user_policy)
+            if not self.quota.allow():
+                return False, 0
 
-# AI Client for OpenRouter
+        # O(1) GCRA check against the (adaptive) per-user hourly limit
+        allowed, time_until_reset, _ = self.rate_limiter.check(user_id)
+        return allowed, time_until_reset
+
+# AI Client for OpenAI-compatible backends (OpenRouter by default)
 class AIChatbotClient:
-    def __init__(self, api_key):
+    def __init__(self, api_key, http_clients, quota=None):
         self.api_key = api_key
-        self.base_url = "https://openrouter.ai/api/v1/chat/completions"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://github.com/ninjazan420/FCKR-discord-bot",
-            "X-Title": "Fckr Chan AI Chatbot Discord Bot"
-        }
+        self.quota = quota  # Records provider usage of metered backends
+        self.http_clients = http_clients  # Shared, pooled HTTP sessions owned by the bot
+        self.streaming = os.getenv('AI_STREAMING', 'false').lower() in ('1', 'true', 'yes')  # Opt-in progressive replies
+
+        # Backends with their own models, pools and stats, chosen per channel
+        self.backends = load_backends(self.api_key)
+        self.default_backend = AI_BACKEND if AI_BACKEND in self.backends else "openrouter"
+        self.channel_backends = parse_channel_backends()
         
-        # Load character data
+        self.payload_metrics = PayloadMetrics()
+        self.time_series = MetricsTimeSeries(TIMESERIES_PATH)  # Per-minute requests, errors, latency histograms
+
+        # Load character data and compile the system prompt once
+        self.character_signature = character_file_signature()
         self.character_data = self.load_character_data()
+        self.last_reload_check = time.monotonic()
+        self.compile_system_prompt()
 
     def load_character_data(self):
         """Load character data from JSON file"""
@@ -166,10 +205,36 @@ class AIChatbotClient:
                 ]
             }
 
-    async def generate_response(self, prompt, character_context, chat_history=None):
+    def compile_system_prompt(self):
+        """Render the system prompt from character data and cache it with its token length"""
+        self.system_prompt = self.build_system_prompt()
+        self.system_prompt_tokens = estimate_tokens(self.system_prompt)
+
+    def get_system_prompt(self):
+        """Return the compiled system prompt, recompiling only if ai_chatbot.json changed on disk"""
+        now = time.monotonic()
+        if now - self.last_reload_check >= CHAR_RELOAD_CHECK_INTERVAL:
+            self.last_reload_check = now
+            signature = character_file_signature()
+            if signature != self.character_signature:
+                self.character_signature = signature
+                self.reload_character_data()
+        return self.system_prompt
+
+    def reload_character_data(self):
+        """Hot reload the persona, keeping the current one if the file can't be parsed"""
         try:
-            # Build comprehensive system prompt with hardcoded character
-            system_prompt = f"""
+            with open(CHAR_PATH, 'r', encoding="utf-8") as f:
+                self.character_data = json.load(f)
+        except Exception as e:
+            logging.error(f"Error reloading character data, keeping current persona: {str(e)}")
+            return
+        self.compile_system_prompt()
+        logging.info(f"Reloaded character data - system prompt is now ~{self.system_prompt_tokens} tokens")
+
+    def build_system_prompt(self):
+        """Build the character system prompt"""
+        return f"""
 You are {self.character_data.get('name', 'Fckr Chan')}, a {self.character_data.get('age', 21)}-year-old cheeky troublemaker who loves to tease and mess with people in a playful way.
 
 Personality: {self.character_data.get('personality', {}).get('main', 'cheeky but funny')} and {self.character_data.get('personality', {}).get('secondary', 'caring, clever')}
@@ -209,60 +274,189 @@ Some of your catchphrases:
 Remember: You're a confident, witty girl who loves helping but always with a playful attitude!
 """
 
-            # Prepare messages for API
-            messages = [
-                {"role": "system", "content": system_prompt}
-            ]
-
-            # Add chat history if available
-            if chat_history:
-                for entry in chat_history:
-                    messages.append({"role": "user", "content": entry["user_message"]})
-                    messages.append({"role": "assistant", "content": entry["bot_response"]})
-
-            # Add current request
-            messages.append({"role": "user", "content": prompt})
-
-            # API request to OpenRouter
-            payload = {
-                "model": "meta-llama/llama-3.1-8b-instruct:free",
-                "messages": messages,
-                "temperature": 0.8,
-                "max_tokens": 150,  # Keep responses short
-                "top_p": 0.9
-            }
+    def backend_for(self, channel_id=None):
+        """Backend configured for a channel, the default backend otherwise"""
+        name = self.channel_backends.get(channel_id, self.default_backend)
+        return self.backends.get(name) or self.backends[self.default_backend]
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.base_url, headers=self.headers, json=payload) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data['choices'][0]['message']['content']
-                    else:
-                        error_text = await response.text()
-                        logging.error(f"API Error: {response.status} - {error_text}")
-                        
-                        # Return character-appropriate error messages
-                        if response.status == 429:
-                            return "oof, looks like i'm getting rate limited. try again in a bit! 😅"
-                        elif response.status in [401, 403]:
-                            return "hmm, having some auth issues. someone needs to fix my api key xd"
-                        elif response.status >= 500:
-                            return "server's having a moment. probably needs more coffee ☕"
-                        else:
-                            return "something went wrong with my brain. did you try turning it off and on again? :3"
+    def build_context_window(self, prompt, chat_history=None):
+        """Fit system prompt, history and the current message into the token budget"""
+        return build_context(self.get_system_prompt(), self.system_prompt_tokens, chat_history, prompt)
+
+    def build_request_body(self, window, model, stream=False):
+        """Serialize the chat completion payload for one model"""
+        payload = {
+            "model": model,
+            "messages": window.messages,
+            "temperature": 0.8,
+            "max_tokens": 150,  # Keep responses short
+            "top_p": 0.9
+        }
+        if stream:
+            payload["stream"] = True
+        return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+    def record_payload(self, window, body):
+        self.payload_metrics.record(window, len(body))
+        logging.debug(f"LLM payload: {window.tokens} tokens, {len(body)} bytes, {window.turns_used} turns ({window.turns_dropped} dropped)")
+
+    async def request_completion(self, backend, endpoint, body, prompt_tokens=0):
+        """POST one completion request with deadline, retries and circuit breaker"""
+        started = time.monotonic()
+        # Every attempt is metered, a hedge launch is one more call of this
+        data = await post_completion(
+            self.http_clients.get(backend.http_profile), endpoint, backend.headers, body, backend.deadline,
+            on_attempt=self.attempt_meter(backend)
+        )
+        content = data['choices'][0]['message']['content']
+        usage = data.get('usage') or {}
+        completion_tokens = usage.get('completion_tokens') or estimate_tokens(content)
+        backend.record_generation(completion_tokens, time.monotonic() - started)
+        self.record_usage(backend, usage.get('prompt_tokens') or prompt_tokens, completion_tokens)
+        return content
+
+    def attempt_meter(self, backend):
+        """Callback counting requests sent to a metered backend, None for unmetered ones"""
+        if self.quota is not None and backend.metered:
+            return self.quota.record_request
+        return None
+
+    def record_usage(self, backend, prompt_tokens, completion_tokens):
+        if self.quota is not None and backend.metered:
+            self.quota.record_tokens(prompt_tokens, completion_tokens)
+
+    async def generate_response(self, prompt, character_context, chat_history=None, backend=None):
+        backend = backend or self.backend_for()
+        started = time.monotonic()
+        try:
+            window = self.build_context_window(prompt, chat_history)
+            bodies = {}
+
+            async def call(endpoint):
+                # Same messages for every model, only the model name differs
+                if endpoint.model not in bodies:
+                    bodies[endpoint.model] = self.build_request_body(window, endpoint.model)
+                    if len(bodies) == 1:
+                        self.record_payload(window, bodies[endpoint.model])
+                return await self.request_completion(backend, endpoint, bodies[endpoint.model], window.tokens)
 
+            # Best model first, hedged with the next one if it's slower than usual
+            response = await hedged_request(backend.model_router, call)
+            self.time_series.record(time.monotonic() - started, ok=True)
+            return response
+
+        except CircuitOpenError:
+            # Failed fast, nothing was sent
+            return CIRCUIT_OPEN_REPLY
+        except LLMRequestError as e:
+            logging.error(f"API Error: {e}")
+            self.time_series.record(time.monotonic() - started, ok=False)
+            return api_error_reply(e.status)
         except Exception as e:
             logging.error(f"Error in API request: {str(e)}")
-            if "timeout" in str(e).lower() or "connection" in str(e).lower():
-                return "connection's being weird. blame the internet, not me! 🌐"
-            else:
-                return "oops, something broke. probably not my fault though ^^"
+            self.time_series.record(time.monotonic() - started, ok=False)
+            return exception_reply(e)
+
+    async def stream_response(self, prompt, character_context, chat_history=None, backend=None):
+        """Yield response text deltas from the SSE stream of the best available model"""
+        backend = backend or self.backend_for()
+        window = self.build_context_window(prompt, chat_history)
+        request_started = time.monotonic()
+        reply_on_failure = CIRCUIT_OPEN_REPLY
+        sent = False
+
+        # Streams can't be hedged once text is out, but fall back to the next model before that
+        for endpoint in backend.model_router.ranked():
+            if not endpoint.breaker.before_request():
+                continue
+            body = self.build_request_body(window, endpoint.model, stream=True)
+            if not sent:
+                self.record_payload(window, body)
+                sent = True
+            started = time.monotonic()
+            streamed = False
+            meter = self.attempt_meter(backend)
+            if meter:
+                meter()
+            try:
+                session = self.http_clients.get(backend.http_profile)
+                async with session.post(endpoint.url, headers=backend.headers, data=body) as response:
+                    if response.status != 200:
+                        raise LLMRequestError(response.status, await response.text())
+
+                    tokens = 0
+                    async for delta in iter_sse_deltas(response):
+                        if not streamed:
+                            endpoint.breaker.record_success()
+                            endpoint.record(time.monotonic() - started, True)
+                            self.time_series.record(time.monotonic() - request_started, ok=True)
+                            streamed = True
+                        tokens += estimate_tokens(delta)
+                        yield delta
+                    backend.record_generation(tokens, time.monotonic() - started)
+                    self.record_usage(backend, window.tokens, tokens)
+                    return
+
+            except asyncio.CancelledError:
+                endpoint.breaker.abandon()
+                raise
+            except LLMRequestError as e:
+                endpoint.record(time.monotonic() - started, False)
+                self.record_stream_failure(endpoint, e)
+                logging.error(f"API Error from {endpoint.model}: {e}")
+                reply_on_failure = api_error_reply(e.status)
+            except Exception as e:
+                logging.error(f"Error in streaming API request to {endpoint.model}: {str(e)}")
+                if streamed:
+                    return  # Keep the partial reply instead of mixing in another model
+                endpoint.record(time.monotonic() - started, False)
+                self.record_stream_failure(endpoint, e)
+                reply_on_failure = exception_reply(e)
+
+        if sent:
+            self.time_series.record(time.monotonic() - request_started, ok=False)
+        else:
+            backend.model_router.failed_fast += 1
+        yield reply_on_failure
+
+    @staticmethod
+    def record_stream_failure(endpoint, error):
+        """Only upstream trouble counts against the circuit, not e.g. a rejected request"""
+        if is_retryable(error):
+            endpoint.breaker.record_failure()
+        else:
+            endpoint.breaker.record_success()
+
+def character_file_signature():
+    """Inode/mtime/size of ai_chatbot.json, None if it doesn't exist"""
+    try:
+        stat = os.stat(CHAR_PATH)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+def api_error_reply(status):
+    """Character-appropriate reply for an OpenRouter error status"""
+    if status == 429:
+        return "oof, looks like i'm getting rate limited. try again in a bit! 😅"
+    elif status in [401, 403]:
+        return "hmm, having some auth issues. someone needs to fix my api key xd"
+    elif status >= 500:
+        return "server's having a moment. probably needs more coffee ☕"
+    else:
+        return "something went wrong with my brain. did you try turning it off and on again? :3"
+
+def exception_reply(error):
+    """Character-appropriate reply for a failed API request"""
+    if "timeout" in str(error).lower() or "connection" in str(error).lower():
+        return "connection's being weird. blame the internet, not me! 🌐"
+    else:
+        return "oops, something broke. probably not my fault though ^^"
 
 # Logging function for AI interactions
-async def log_ai_interaction(client, message, prompt, response=None, is_request=True):
-    """Logs AI interactions in the logging channel as embed"""
-    logging_channel = client.get_channel(client.logging_channel)
-    if not logging_channel:
+def log_ai_interaction(client, message, prompt, response=None, is_request=True):
+    """Logs AI interactions in the logging channel as embed (batched, never waits)"""
+    if not client.ai_interaction_logging:
         return
 
     timestamp = discord.utils.utcnow()
@@ -270,10 +464,10 @@ async def log_ai_interaction(client, message, prompt, response=None, is_request=
 
     if is_request:
         title = "🤖 AI Chatbot Request"
-        description = f"**Message:**\n{prompt[:4000]}" if len(prompt) <= 4000 else f"**Message:**\n{prompt[:3997]}..."
+        description = f"**Message:**\n{prompt}"
     else:
         title = "🤖 AI Chatbot Response"
-        description = f"**Response:**\n{response[:4000]}" if len(response) <= 4000 else f"**Response:**\n{response[:3997]}..."
+        description = f"**Response:**\n{response}"
 
     embed = discord.Embed(
         title=title,
@@ -305,13 +499,18 @@ async def log_ai_interaction(client, message, prompt, response=None, is_request=
     interaction_type = "Request" if is_request else "Response"
     embed.set_footer(text=f"{interaction_type} • {timestamp.strftime('%d.%m.%Y %H:%M:%S')}")
 
-    await logging_channel.send(embed=embed)
+    client.ai_log_sink.submit(embed)  # Truncates the description to LOG_DESCRIPTION_MAX
 
 def register_ai_chatbot_commands(client):
     """Initialize AI chatbot components"""
     client.session_manager = SessionManager()
-    client.ai_chatbot_client = AIChatbotClient(os.environ.get('OPENROUTER_KEY'))
+    client.ai_chatbot_client = AIChatbotClient(os.environ.get('OPENROUTER_KEY'), client.http_clients, client.session_manager.quota)
     client.message_history = {}
+    client.bot_message_index = BotMessageIndex()
+    client.ai_request_queue = UserRequestQueue(lambda batch: process_ai_request_batch(client, batch))
+    client.ai_scheduler = LLMScheduler()
+    client.ai_log_sink = InteractionLogSink(client)
+    client.ai_interaction_logging = os.getenv('AI_INTERACTION_LOGGING', 'true').lower() in ('1', 'true', 'yes')
 
     # Initialize statistics with default values
     client.ai_chatbot_stats = {
@@ -363,38 +562,29 @@ async def handle_ai_chatbot_message(client, message):
     Processes AI chatbot related messages (mentions, quotes, and admin replies).
     This function is called from the on_message event handler in main.py.
     """
-    # Check if bot was mentioned (but ignore DMs completely)
-    mentioned = client.user in message.mentions
-    is_dm = isinstance(message.channel, discord.DMChannel)
-    
-    # Check if this is a reply to the bot
-    is_reply_to_bot = False
-    if message.reference and message.reference.message_id:
-        try:
-            referenced_message = await message.channel.fetch_message(message.reference.message_id)
-            is_reply_to_bot = referenced_message.author == client.user
-        except:
-            is_reply_to_bot = False
-    
-    # Check if user is admin (you can customize this list)
-    admin_ids = [int(os.getenv('ADMIN_USER_ID', 0))]  # Add more admin IDs as needed
-    is_admin = message.author.id in admin_ids
-    
     # CRITICAL: Only respond to mentions or replies to bot (NEVER to DMs or random messages)
-    if is_dm:
+    if isinstance(message.channel, discord.DMChannel):
         return False
     
-    # Check if message is in allowed AI channel
+    # Check if message is in allowed AI channel (before any other work);
+    # channels with their own backend in AI_CHANNEL_BACKENDS are allowed too
     allowed_ai_channel = int(os.getenv('AI_CHANNEL_ID', 1371926833511006218))
-    if message.channel.id != allowed_ai_channel:
+    if message.channel.id != allowed_ai_channel and message.channel.id not in client.ai_chatbot_client.channel_backends:
         return False
     
+    # Check if bot was mentioned or the message replies to the bot
+    mentioned = client.user in message.mentions
+    is_reply_to_bot = False
+    if not mentioned and message.reference and message.reference.message_id:
+        is_reply_to_bot = await is_reply_to_bot_message(client, message)
+    
     # Respond ONLY if: mentioned or reply to bot (even for admins)
     if not (mentioned or is_reply_to_bot):
         return False
 
     # Rate limit check
-    can_respond, time_until_reset = client.session_manager.check_rate_limit(message.author.id, client)
+    metered = client.ai_chatbot_client.backend_for(message.channel.id).metered
+    can_respond, time_until_reset = client.session_manager.check_rate_limit(message.author.id, client, metered)
     
     if not can_respond:
         if time_until_reset > 0:
@@ -404,6 +594,9 @@ async def handle_ai_chatbot_message(client, message):
                 await message.reply(f"whoa there, slow down tiger! you've hit your hourly limit. try again in {minutes}m {seconds}s 😏", delete_after=15)
             else:
                 await message.reply(f"easy there, code monkey! you've been a bit too chatty. wait {seconds}s and we can continue our fun 😈", delete_after=15)
+        elif metered and client.session_manager.quota.exhausted():
+            reset_at = int(time.time() + client.session_manager.quota.seconds_until_reset())
+            await message.reply(f"i'm all talked out for today, my daily brain budget is gone. back <t:{reset_at}:R> 💤", delete_after=30)
         else:
             await message.reply("sorry, you can't use the bot right now 🙈", delete_after=10)
         return False
@@ -417,23 +610,83 @@ async def handle_ai_chatbot_message(client, message):
     if not prompt:
         return False
 
-    # Log request - DISABLED to prevent spam
-    # await log_ai_interaction(client, message, prompt, is_request=True)
+    # Log request (buffered, sent in batches)
+    log_ai_interaction(client, message, prompt, is_request=True)
 
-    async with message.channel.typing():
-        # Context for the conversation
-        context = {
-            "user_name": message.author.display_name,
-            "guild_name": message.guild.name if message.guild else "DM",
-            "channel_name": message.channel.name if hasattr(message.channel, 'name') else "Direct Message"
-        }
+    # Serialize per user: requests piling up behind an in-flight one are answered together
+    await client.ai_request_queue.submit(message.author.id, message, prompt)
+    return True
+
+async def is_reply_to_bot_message(client, message):
+    """Resolve whether a reply targets the bot, REST only as last resort"""
+    index = client.bot_message_index
+    reference = message.reference
+
+    # 1. Discord already resolved the referenced message in the gateway payload
+    resolved = reference.resolved
+    if isinstance(resolved, discord.Message):
+        index.record("resolved")
+        return resolved.author == client.user
+
+    # 2. Message cache
+    cached = reference.cached_message
+    if cached is not None:
+        index.record("cache")
+        return cached.author == client.user
+
+    # 3. Index of messages the bot sent since startup
+    known = index.lookup(reference.message_id)
+    if known is not None:
+        index.record("index")
+        return known
+
+    # 4. Older than the index: fetch it
+    index.record("rest")
+    try:
+        referenced_message = await message.channel.fetch_message(reference.message_id)
+        return referenced_message.author == client.user
+    except Exception:
+        return False
+
+async def process_ai_request_batch(client, batch):
+    """Answers one or more queued requests of a user with a single LLM call"""
+    # Reply to the newest message, combining all prompts that piled up
+    message = batch[-1][0]
+    prompt = "\n".join(queued_prompt for _, queued_prompt in batch)
+
+    # Upstream is known to be down: answer right away instead of queueing and typing
+    backend = client.ai_chatbot_client.backend_for(message.channel.id)
+    if not backend.model_router.available():
+        backend.model_router.failed_fast += 1
+        await message.reply(CIRCUIT_OPEN_REPLY, delete_after=30)
+        return
+
+    # Bounded concurrency: owner and bot admins get priority, hopeless requests are shed early
+    priority = await get_request_priority(client, message.author.id)
+    if not await client.ai_scheduler.acquire(priority):
+        await message.reply("whoa, everyone's yelling at me at once. slow down and try again in a bit 😵", delete_after=15)
+        return
+
+    started = time.monotonic()
+    try:
+        async with message.channel.typing():
+            # Context for the conversation
+            context = {
+                "user_name": message.author.display_name,
+                "guild_name": message.guild.name if message.guild else "DM",
+                "channel_name": message.channel.name if hasattr(message.channel, 'name') else "Direct Message"
+            }
         
-        # Add context about mentioned users
-        mentioned_users_context = ""
-        if message.mentions:
-            mentioned_users_info = []
-            for mentioned_user in message.mentions:
-                if mentioned_user != client.user:  # Don't include the bot itself
+            # Add context about mentioned users (from every coalesced message)
+            mentioned_users_context = ""
+            mentioned_users = {}
+            for queued_message, _ in batch:
+                for mentioned_user in queued_message.mentions:
+                    if mentioned_user != client.user:  # Don't include the bot itself
+                        mentioned_users[mentioned_user.id] = mentioned_user
+            if mentioned_users:
+                mentioned_users_info = []
+                for mentioned_user in mentioned_users.values():
                     user_info = f"{mentioned_user.display_name} (ID: {mentioned_user.id})"
                     # Add user stats if available
                     user_stats = client.session_manager.get_user_stats(mentioned_user.id)
@@ -443,31 +696,45 @@ async def handle_ai_chatbot_message(client, message):
                         user_info += " - hasn't chatted with me yet"
                     mentioned_users_info.append(user_info)
             
-            if mentioned_users_info:
                 mentioned_users_context = f"\n\nMentioned users in this message: {', '.join(mentioned_users_info)}"
         
-        # Enhanced prompt with user context
-        enhanced_prompt = prompt + mentioned_users_context
+            # Enhanced prompt with user context
+            enhanced_prompt = prompt + mentioned_users_context
 
-        # Get previous conversation data
-        chat_history = client.session_manager.get_user_context(message.author.id)
+            # Get previous conversation data (previous request of this user is already committed)
+            # (recent turns plus relevant older exchanges)
+            chat_history = await client.session_manager.get_user_context(message.author.id, prompt)
 
-        # Generate response with conversation history and enhanced context
-        response = await client.ai_chatbot_client.generate_response(enhanced_prompt, context, chat_history)
+            # Generate response with conversation history and enhanced context
+            if client.ai_chatbot_client.streaming:
+                # Reply is sent after the first sentence and edited while the rest streams in
+                response = await stream_reply(client.ai_chatbot_client, message, enhanced_prompt, context, chat_history, backend)
+            else:
+                response = await client.ai_chatbot_client.generate_response(enhanced_prompt, context, chat_history, backend)
 
-        # Store interaction in session manager (use original prompt for storage)
-        client.session_manager.add_interaction(message.author.id, prompt, response)
+            # Store interaction in session manager (use original prompt for storage)
+            client.session_manager.add_interaction(message.author.id, prompt, response)
 
-        # Update statistics
-        update_ai_chatbot_stats(client, "message")
+            # Update statistics
+            update_ai_chatbot_stats(client, "message")
 
-        # Log response - DISABLED to prevent spam
-        # await log_ai_interaction(client, message, prompt, response, is_request=False)
+            # Log response (buffered, sent in batches)
+            log_ai_interaction(client, message, prompt, response, is_request=False)
 
-        # Send response
-        await message.reply(response)
+            # Send response (already sent progressively when streaming)
+            if not client.ai_chatbot_client.streaming:
+                await message.reply(response)
+    finally:
+        client.ai_scheduler.release(time.monotonic() - started)
 
-    return True
+async def get_request_priority(client, user_id):
+    """Scheduler lane for a user: owner first, then bot admins, then everyone else"""
+    if user_id == int(os.getenv('ADMIN_USER_ID', 0)):
+        return PRIORITY_OWNER
+    admin_cog = client.get_cog('AdminManagerCog')
+    if admin_cog and await admin_cog.is_bot_admin(user_id):
+        return PRIORITY_ADMIN
+    return PRIORITY_USER
 
 # Function to update statistics
 def update_ai_chatbot_stats(client, event_type=None):
@@ -479,9 +746,8 @@ def update_ai_chatbot_stats(client, event_type=None):
     # Update last update timestamp
     client.ai_chatbot_stats["lastUpdate"] = datetime.datetime.now().isoformat()
     
-    # Update user counts
-    client.ai_chatbot_stats["total_users"] = len(client.session_manager.user_sessions)
-    client.ai_chatbot_stats["active_sessions"] = sum(1 for sessions in client.session_manager.user_sessions.values() if len(sessions) > 0)
+    # Update user count (active sessions need a scan, they're refreshed on save)
+    client.ai_chatbot_stats["total_users"] = client.session_manager.store.user_count()
 
     # Save statistics every 5 updates (more frequent saves)
     if (client.ai_chatbot_stats["commandCount"] + client.ai_chatbot_stats["messageCount"]) % 5 == 0:
@@ -504,34 +770,55 @@ def save_ai_chatbot_stats(client):
         
         # Update dynamic fields
         client.ai_chatbot_stats["lastUpdate"] = datetime.datetime.now().isoformat()
-        client.ai_chatbot_stats["total_users"] = len(client.session_manager.user_sessions)
-        client.ai_chatbot_stats["active_sessions"] = sum(1 for sessions in client.session_manager.user_sessions.values() if len(sessions) > 0)
+        client.ai_chatbot_stats["total_users"] = client.session_manager.store.user_count()
+        client.ai_chatbot_stats["active_sessions"] = client.session_manager.active_sessions
         
-        # Ensure logs directory exists
-        os.makedirs(LOGS_DIR, exist_ok=True)
-        
-        # Save to file with backup
-        temp_path = STATS_PATH + '.tmp'
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            json.dump(client.ai_chatbot_stats, f, ensure_ascii=False, indent=2)
-        
-        # Atomic move to prevent corruption
-        if os.path.exists(temp_path):
-            if os.path.exists(STATS_PATH):
-                os.replace(temp_path, STATS_PATH)
-            else:
-                os.rename(temp_path, STATS_PATH)
+        # Serialize on the loop (cheap), write to disk in a worker thread
+        files = {
+            STATS_PATH: json.dumps(client.ai_chatbot_stats, ensure_ascii=False, indent=2).encode('utf-8'),
+            TIMESERIES_PATH: client.ai_chatbot_client.time_series.to_bytes()
+        }
+        client.session_manager.quota.save()  # Also saves itself while requests come in
+        # One write at a time, they share the .tmp paths
+        pending = getattr(client, 'ai_stats_write', None)
+        if pending is not None and not pending.done():
+            client.ai_stats_write_again = True  # Saved with fresh numbers once the current write is done
+            return
+        client.ai_stats_write_again = False
+        try:
+            client.ai_stats_write = asyncio.get_running_loop().run_in_executor(None, write_files_atomic, files)
+        except RuntimeError:
+            # No running loop or executor (e.g. during shutdown): write directly
+            client.ai_stats_write = None
+            write_files_atomic(files)
+        else:
+            def written(_):
+                if client.ai_stats_write_again:
+                    save_ai_chatbot_stats(client)
+            client.ai_stats_write.add_done_callback(written)
         
         logging.info(f"AI Chatbot statistics saved - Messages: {client.ai_chatbot_stats['messageCount']}, Commands: {client.ai_chatbot_stats['commandCount']}, Users: {client.ai_chatbot_stats['total_users']}")
     except Exception as e:
         logging.error(f"Error saving AI Chatbot statistics: {str(e)}")
-        # Try to clean up temp file
+
+def write_files_atomic(files):
+    """Write {path: bytes} via temp file + atomic move to prevent corruption"""
+    # Ensure logs directory exists
+    os.makedirs(LOGS_DIR, exist_ok=True)
+    for path, data in files.items():
+        temp_path = path + '.tmp'
         try:
-            temp_path = STATS_PATH + '.tmp'
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-        except:
-            pass
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logging.error(f"Error writing {path}: {str(e)}")
+            # Try to clean up temp file
+            try:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            except:
+                pass
 
 # Function to display AI statistics
 async def show_ai_stats(interaction, client):
@@ -565,10 +852,103 @@ async def show_ai_stats(interaction, client):
         
         embed.add_field(
             name="💭 Memory Stats",
-            value=f"**Max History:** {MAX_HISTORY_LENGTH} msgs/user\n**Rate Limit:** 25 msgs/hour\n**Sessions Saved:** Yes",
+            value=f"**Max History:** {MAX_HISTORY_LENGTH} msgs/user\n**Rate Limit:** {USER_HOURLY_LIMIT} msgs/hour\n**Sessions Saved:** Yes\n**Hot Set:** {len(client.session_manager.store.hot)}/{client.session_manager.store.hot_set_size} users\n**Long-term:** {client.session_manager.memory.count if client.session_manager.memory else 'off'} exchanges",
             inline=False
         )
         
+        payload_metrics = client.ai_chatbot_client.payload_metrics
+        embed.add_field(
+            name="📦 Payload",
+            value=f"**Budget:** {CONTEXT_TOKEN_BUDGET} tokens\n**Avg Size:** ~{payload_metrics.avg_tokens:.0f} tokens / {payload_metrics.avg_bytes / 1024:.1f} KB\n**Turns Dropped:** {payload_metrics.turns_dropped}",
+            inline=True
+        )
+
+        scheduler_stats = client.ai_scheduler.stats()
+        embed.add_field(
+            name="🚦 Scheduler",
+            value=f"**Running:** {scheduler_stats['running']}/{client.ai_scheduler.max_concurrency}\n**Queue:** {scheduler_stats['queue_depth']} (max {scheduler_stats['max_queue_depth']})\n**Wait:** avg {scheduler_stats['avg_wait']:.1f}s / p95 {scheduler_stats['p95_wait']:.1f}s\n**Shed:** {scheduler_stats['shed']} | **Merged:** {client.ai_request_queue.coalesced}",
+            inline=True
+        )
+
+        model_lines = []
+        for backend in client.ai_chatbot_client.backends.values():
+            for model_stats in backend.model_router.stats():
+                p50 = f"{model_stats['p50']:.1f}s" if model_stats['p50'] is not None else "-"
+                p95 = f"{model_stats['p95']:.1f}s" if model_stats['p95'] is not None else "-"
+                model_lines.append(f"**{model_stats['model'].split('/')[-1]}:** p50 {p50} / p95 {p95}, {model_stats['errors']} errors")
+        embed.add_field(
+            name="🧠 Models",
+            value="\n".join(model_lines)[:1024] or "None configured",
+            inline=False
+        )
+
+        reply_lookups = client.bot_message_index.lookups
+        embed.add_field(
+            name="↩️ Reply Detection",
+            value=f"**Lookups:** {sum(reply_lookups.values())}\n**REST Fallbacks:** {reply_lookups['rest']} ({client.bot_message_index.rest_hit_rate():.0%})",
+            inline=True
+        )
+
+        time_series = client.ai_chatbot_client.time_series
+        latency_lines = []
+        for label, window_minutes in (("1h", 60), ("24h", 1440)):
+            summary = time_series.summary(window_minutes)
+            latency_lines.append(f"**{label}:** {summary['requests']} req, {summary['errors']} err, p50 {format_latency(summary['p50'])} / p95 {format_latency(summary['p95'])}")
+        embed.add_field(
+            name="📈 Latency Trend",
+            value="\n".join(latency_lines),
+            inline=False
+        )
+
+        quota_stats = client.session_manager.quota.stats()
+        if quota_stats['exhausted_in'] is None:
+            forecast = "lasts until reset"
+        else:
+            forecast = f"empty in {int(quota_stats['exhausted_in'] // 3600)}h {int(quota_stats['exhausted_in'] % 3600 // 60)}m"
+        token_budget = f"/{quota_stats['daily_tokens']}" if quota_stats['daily_tokens'] else ""
+        embed.add_field(
+            name="⛽ Daily Quota",
+            value=f"**Requests:** {quota_stats['requests']}/{quota_stats['daily_requests']}\n**Tokens:** {quota_stats['tokens']}{token_budget}\n**Burn:** {quota_stats['request_rate']} req/h, {forecast}\n**User Limit:** {quota_stats['user_limit']}/hour | **Denied:** {quota_stats['denied']}\n**Reset:** in {int(quota_stats['reset_in'] // 3600)}h {int(quota_stats['reset_in'] % 3600 // 60)}m",
+            inline=True
+        )
+
+        breaker_lines = []
+        failed_fast = 0
+        for backend in client.ai_chatbot_client.backends.values():
+            failed_fast += backend.model_router.failed_fast
+            for model_stats in backend.model_router.stats():
+                state = model_stats['breaker'].replace('_', '-')
+                if model_stats['breaker'] != "closed":
+                    state += f" (probe in {model_stats['retry_in']:.0f}s)"
+                breaker_lines.append(f"**{model_stats['model'].split('/')[-1]}:** {state}, {model_stats['trips']} trips, {model_stats['retries']} retries")
+        breaker_lines.append(f"**Failed Fast:** {failed_fast}")
+        backend_lines = []
+        for backend in client.ai_chatbot_client.backends.values():
+            backend_stats = backend.stats()
+            p50 = f"{backend_stats['p50']:.1f}s" if backend_stats['p50'] is not None else "-"
+            throughput = f"{backend_stats['tokens_per_second']:.1f} tok/s" if backend_stats['tokens_per_second'] is not None else "- tok/s"
+            default = " (default)" if backend.name == client.ai_chatbot_client.default_backend else ""
+            backend_lines.append(f"**{backend.name}{default}:** {backend_stats['requests']} req, p50 {p50}, {throughput}")
+        embed.add_field(
+            name="⚡ Backends",
+            value="\n".join(backend_lines)[:1024],
+            inline=False
+        )
+
+        embed.add_field(
+            name="🔌 Circuit Breaker",
+            value="\n".join(breaker_lines)[:1024],
+            inline=False
+        )
+
+        pool_stats = client.http_clients.stats().get("openrouter")
+        if pool_stats:
+            embed.add_field(
+                name="🌐 Connection Pool",
+                value=f"**Open:** {pool_stats['open_connections']} ({pool_stats['idle_connections']} idle)\n**Requests:** {pool_stats['requests']}\n**Reuse Ratio:** {pool_stats['reuse_ratio']:.0%}",
+                inline=True
+            )
+        
         embed.set_footer(text="Last updated")
         embed.set_thumbnail(url=client.user.display_avatar.url)
         
@@ -610,10 +990,103 @@ async def show_ai_stats_ctx(ctx, client):
         
         embed.add_field(
             name="💭 Memory Stats",
-            value=f"**Max History:** {MAX_HISTORY_LENGTH} msgs/user\n**Rate Limit:** 25 msgs/hour\n**Sessions Saved:** Yes",
+            value=f"**Max History:** {MAX_HISTORY_LENGTH} msgs/user\n**Rate Limit:** {USER_HOURLY_LIMIT} msgs/hour\n**Sessions Saved:** Yes\n**Hot Set:** {len(client.session_manager.store.hot)}/{client.session_manager.store.hot_set_size} users\n**Long-term:** {client.session_manager.memory.count if client.session_manager.memory else 'off'} exchanges",
             inline=False
         )
         
+        payload_metrics = client.ai_chatbot_client.payload_metrics
+        embed.add_field(
+            name="📦 Payload",
+            value=f"**Budget:** {CONTEXT_TOKEN_BUDGET} tokens\n**Avg Size:** ~{payload_metrics.avg_tokens:.0f} tokens / {payload_metrics.avg_bytes / 1024:.1f} KB\n**Turns Dropped:** {payload_metrics.turns_dropped}",
+            inline=True
+        )
+
+        scheduler_stats = client.ai_scheduler.stats()
+        embed.add_field(
+            name="🚦 Scheduler",
+            value=f"**Running:** {scheduler_stats['running']}/{client.ai_scheduler.max_concurrency}\n**Queue:** {scheduler_stats['queue_depth']} (max {scheduler_stats['max_queue_depth']})\n**Wait:** avg {scheduler_stats['avg_wait']:.1f}s / p95 {scheduler_stats['p95_wait']:.1f}s\n**Shed:** {scheduler_stats['shed']} | **Merged:** {client.ai_request_queue.coalesced}",
+            inline=True
+        )
+
+        model_lines = []
+        for backend in client.ai_chatbot_client.backends.values():
+            for model_stats in backend.model_router.stats():
+                p50 = f"{model_stats['p50']:.1f}s" if model_stats['p50'] is not None else "-"
+                p95 = f"{model_stats['p95']:.1f}s" if model_stats['p95'] is not None else "-"
+                model_lines.append(f"**{model_stats['model'].split('/')[-1]}:** p50 {p50} / p95 {p95}, {model_stats['errors']} errors")
+        embed.add_field(
+            name="🧠 Models",
+            value="\n".join(model_lines)[:1024] or "None configured",
+            inline=False
+        )
+
+        reply_lookups = client.bot_message_index.lookups
+        embed.add_field(
+            name="↩️ Reply Detection",
+            value=f"**Lookups:** {sum(reply_lookups.values())}\n**REST Fallbacks:** {reply_lookups['rest']} ({client.bot_message_index.rest_hit_rate():.0%})",
+            inline=True
+        )
+
+        time_series = client.ai_chatbot_client.time_series
+        latency_lines = []
+        for label, window_minutes in (("1h", 60), ("24h", 1440)):
+            summary = time_series.summary(window_minutes)
+            latency_lines.append(f"**{label}:** {summary['requests']} req, {summary['errors']} err, p50 {format_latency(summary['p50'])} / p95 {format_latency(summary['p95'])}")
+        embed.add_field(
+            name="📈 Latency Trend",
+            value="\n".join(latency_lines),
+            inline=False
+        )
+
+        quota_stats = client.session_manager.quota.stats()
+        if quota_stats['exhausted_in'] is None:
+            forecast = "lasts until reset"
+        else:
+            forecast = f"empty in {int(quota_stats['exhausted_in'] // 3600)}h {int(quota_stats['exhausted_in'] % 3600 // 60)}m"
+        token_budget = f"/{quota_stats['daily_tokens']}" if quota_stats['daily_tokens'] else ""
+        embed.add_field(
+            name="⛽ Daily Quota",
+            value=f"**Requests:** {quota_stats['requests']}/{quota_stats['daily_requests']}\n**Tokens:** {quota_stats['tokens']}{token_budget}\n**Burn:** {quota_stats['request_rate']} req/h, {forecast}\n**User Limit:** {quota_stats['user_limit']}/hour | **Denied:** {quota_stats['denied']}\n**Reset:** in {int(quota_stats['reset_in'] // 3600)}h {int(quota_stats['reset_in'] % 3600 // 60)}m",
+            inline=True
+        )
+
+        breaker_lines = []
+        failed_fast = 0
+        for backend in client.ai_chatbot_client.backends.values():
+            failed_fast += backend.model_router.failed_fast
+            for model_stats in backend.model_router.stats():
+                state = model_stats['breaker'].replace('_', '-')
+                if model_stats['breaker'] != "closed":
+                    state += f" (probe in {model_stats['retry_in']:.0f}s)"
+                breaker_lines.append(f"**{model_stats['model'].split('/')[-1]}:** {state}, {model_stats['trips']} trips, {model_stats['retries']} retries")
+        breaker_lines.append(f"**Failed Fast:** {failed_fast}")
+        backend_lines = []
+        for backend in client.ai_chatbot_client.backends.values():
+            backend_stats = backend.stats()
+            p50 = f"{backend_stats['p50']:.1f}s" if backend_stats['p50'] is not None else "-"
+            throughput = f"{backend_stats['tokens_per_second']:.1f} tok/s" if backend_stats['tokens_per_second'] is not None else "- tok/s"
+            default = " (default)" if backend.name == client.ai_chatbot_client.default_backend else ""
+            backend_lines.append(f"**{backend.name}{default}:** {backend_stats['requests']} req, p50 {p50}, {throughput}")
+        embed.add_field(
+            name="⚡ Backends",
+            value="\n".join(backend_lines)[:1024],
+            inline=False
+        )
+
+        embed.add_field(
+            name="🔌 Circuit Breaker",
+            value="\n".join(breaker_lines)[:1024],
+            inline=False
+        )
+
+        pool_stats = client.http_clients.stats().get("openrouter")
+        if pool_stats:
+            embed.add_field(
+                name="🌐 Connection Pool",
+                value=f"**Open:** {pool_stats['open_connections']} ({pool_stats['idle_connections']} idle)\n**Requests:** {pool_stats['requests']}\n**Reuse Ratio:** {pool_stats['reuse_ratio']:.0%}",
+                inline=True
+            )
+        
         embed.set_footer(text="Last updated")
         embed.set_thumbnail(url=client.user.display_avatar.url)
         
@@ -629,7 +1102,7 @@ async def show_user_memory(interaction, client):
     try:
         user_id = interaction.user.id
         user_stats = client.session_manager.get_user_stats(user_id)
-        sessions = client.session_manager.get_user_context(user_id)
+        sessions = await client.session_manager.get_user_context(user_id)
         
         embed = discord.Embed(
             title="🧠 Your Memory with Me",
@@ -647,7 +1120,7 @@ async def show_user_memory(interaction, client):
         else:
             embed.add_field(
                 name="📊 Your Stats",
-                value=f"**Total Messages:** {user_stats['total_messages']}\n**First Chat:** <t:{int(datetime.datetime.fromisoformat(user_stats['first_interaction']).timestamp())}:R>\n**Last Chat:** <t:{int(datetime.datetime.fromisoformat(user_stats['last_interaction']).timestamp())}:R>",
+                value=f"**Total Messages:** {user_stats['total_messages']}\n**First Chat:** <t:{user_stats['first_interaction']}:R>\n**Last Chat:** <t:{user_stats['last_interaction']}:R>",
                 inline=False
             )
             
@@ -656,11 +1129,10 @@ async def show_user_memory(interaction, client):
             if recent_sessions:
                 history_text = ""
                 for i, session in enumerate(recent_sessions, 1):
-                    timestamp = datetime.datetime.fromisoformat(session["timestamp"])
-                    user_msg = session["user_message"][:50] + "..." if len(session["user_message"]) > 50 else session["user_message"]
-                    bot_msg = session["bot_response"][:50] + "..." if len(session["bot_response"]) > 50 else session["bot_response"]
+                    user_msg = session.user_message[:50] + "..." if len(session.user_message) > 50 else session.user_message
+                    bot_msg = session.bot_response[:50] + "..." if len(session.bot_response) > 50 else session.bot_response
                     
-                    history_text += f"**{i}.** <t:{int(timestamp.timestamp())}:R>\n"
+                    history_text += f"**{i}.** <t:{session.timestamp}:R>\n"
                     history_text += f"**You:** {user_msg}\n"
                     history_text += f"**Me:** {bot_msg}\n\n"
                 
@@ -685,7 +1157,7 @@ async def show_user_memory_ctx(ctx, client):
     try:
         user_id = ctx.author.id
         user_stats = client.session_manager.get_user_stats(user_id)
-        sessions = client.session_manager.get_user_context(user_id)
+        sessions = await client.session_manager.get_user_context(user_id)
         
         embed = discord.Embed(
             title="🧠 Your Memory with Me",
@@ -703,7 +1175,7 @@ async def show_user_memory_ctx(ctx, client):
         else:
             embed.add_field(
                 name="📊 Your Stats",
-                value=f"**Total Messages:** {user_stats['total_messages']}\n**First Chat:** <t:{int(datetime.datetime.fromisoformat(user_stats['first_interaction']).timestamp())}:R>\n**Last Chat:** <t:{int(datetime.datetime.fromisoformat(user_stats['last_interaction']).timestamp())}:R>",
+                value=f"**Total Messages:** {user_stats['total_messages']}\n**First Chat:** <t:{user_stats['first_interaction']}:R>\n**Last Chat:** <t:{user_stats['last_interaction']}:R>",
                 inline=False
             )
             
@@ -712,11 +1184,10 @@ async def show_user_memory_ctx(ctx, client):
             if recent_sessions:
                 history_text = ""
                 for i, session in enumerate(recent_sessions, 1):
-                    timestamp = datetime.datetime.fromisoformat(session["timestamp"])
-                    user_msg = session["user_message"][:50] + "..." if len(session["user_message"]) > 50 else session["user_message"]
-                    bot_msg = session["bot_response"][:50] + "..." if len(session["bot_response"]) > 50 else session["bot_response"]
+                    user_msg = session.user_message[:50] + "..." if len(session.user_message) > 50 else session.user_message
+                    bot_msg = session.bot_response[:50] + "..." if len(session.bot_response) > 50 else session.bot_response
                     
-                    history_text += f"**{i}.** <t:{int(timestamp.timestamp())}:R>\n"
+                    history_text += f"**{i}.** <t:{session.timestamp}:R>\n"
                     history_text += f"**You:** {user_msg}\n"
                     history_text += f"**Me:** {bot_msg}\n\n"
                 
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import os
+
+from token_count import estimate_tokens
+
+# Token budget for system prompt + history + current message
+CONTEXT_TOKEN_BUDGET = int(os.getenv('AI_CONTEXT_TOKEN_BUDGET', 1500))
+MIN_TRUNCATED_TURN_TOKENS = 24  # Below this an older turn is dropped instead of truncated
+MESSAGE_OVERHEAD_TOKENS = 4  # Role/formatting tokens per chat message
+
+
+def entry_tokens(entry):
+    """Token counts (user, bot) of a stored interaction, cached on the entry itself"""
+    if entry.user_tokens is None:
+        entry.user_tokens = estimate_tokens(entry.user_message)
+        entry.bot_tokens = estimate_tokens(entry.bot_response)
+    return entry.user_tokens, entry.bot_tokens
+
+
+def truncate_to_tokens(text, tokens, max_tokens):
+    """Cut text down to roughly max_tokens, proportionally by characters"""
+    if tokens <= max_tokens:
+        return text
+    keep = max(1, int(len(text) * max_tokens / tokens))
+    return text[:keep].rstrip() + "…"
+
+
+class ContextWindow:
+    """Chat messages for one request plus the numbers behind them"""
+
+    def __init__(self, messages, tokens, turns_used, turns_truncated, turns_dropped):
+        self.messages = messages
+        self.tokens = tokens
+        self.turns_used = turns_used
+        self.turns_truncated = turns_truncated
+        self.turns_dropped = turns_dropped
+
+
+def build_context(system_prompt, system_tokens, chat_history, prompt, budget=CONTEXT_TOKEN_BUDGET):
+    """Fill the token budget newest-first: system prompt and current message always fit,
+    then as many recent turns as possible, truncating the oldest one that only partly fits.
+    """
+    prompt_tokens = estimate_tokens(prompt) + MESSAGE_OVERHEAD_TOKENS
+    used = system_tokens + MESSAGE_OVERHEAD_TOKENS + prompt_tokens
+    remaining = budget - used
+
+    history = chat_history or []
+    turns = []  # Newest first
+    truncated = 0
+    for entry in reversed(history):
+        user_tokens, bot_tokens = entry_tokens(entry)
+        turn_tokens = user_tokens + bot_tokens + 2 * MESSAGE_OVERHEAD_TOKENS
+        if turn_tokens <= remaining:
+            turns.append((entry.user_message, entry.bot_response))
+            remaining -= turn_tokens
+            continue
+
+        # Partly fits: keep a shortened version of this turn, then stop
+        available = remaining - 2 * MESSAGE_OVERHEAD_TOKENS
+        if available >= MIN_TRUNCATED_TURN_TOKENS:
+            user_share = available * user_tokens // max(1, user_tokens + bot_tokens)
+            turns.append((
+                truncate_to_tokens(entry.user_message, user_tokens, max(1, user_share)),
+                truncate_to_tokens(entry.bot_response, bot_tokens, max(1, available - user_share))
+            ))
+            remaining -= available + 2 * MESSAGE_OVERHEAD_TOKENS
+            truncated = 1
+        break
+
+    messages = [{"role": "system", "content": system_prompt}]
+    for user_message, bot_response in reversed(turns):
+        messages.append({"role": "user", "content": user_message})
+        messages.append({"role": "assistant", "content": bot_response})
+    messages.append({"role": "user", "content": prompt})
+
+    return ContextWindow(
+        messages,
+        budget - remaining,
+        len(turns),
+        truncated,
+        len(history) - len(turns)
+    )
+
+
+class PayloadMetrics:
+    """Running payload-size numbers for outgoing LLM requests"""
+
+    def __init__(self):
+        self.requests = 0
+        self.tokens_total = 0
+        self.bytes_total = 0
+        self.turns_dropped = 0
+        self.turns_truncated = 0
+        self.last_tokens = 0
+        self.last_bytes = 0
+
+    def record(self, window, payload_bytes):
+        self.requests += 1
+        self.tokens_total += window.tokens
+        self.bytes_total += payload_bytes
+        self.turns_dropped += window.turns_dropped
+        self.turns_truncated += window.turns_truncated
+        self.last_tokens = window.tokens
+        self.last_bytes = payload_bytes
+
+    @property
+    def avg_tokens(self):
+        return self.tokens_total / self.requests if self.requests else 0
+
+    @property
+    def avg_bytes(self):
+        return self.bytes_total / self.requests if self.requests else 0
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import asyncio
+import collections
+import logging
+import os
+import time
+
+from ai_transport import CircuitBreaker, CircuitOpenError
+
+# Ordered model list, entries are "model" or "model@https://endpoint/chat/completions"
+AI_MODELS = os.getenv('AI_MODELS', 'meta-llama/llama-3.1-8b-instruct:free')
+AI_HEDGE_MIN_DELAY = float(os.getenv('AI_HEDGE_MIN_DELAY', 2.0))  # Never hedge earlier than this
+AI_HEDGE_MAX_DELAY = float(os.getenv('AI_HEDGE_MAX_DELAY', 8.0))  # Always hedge after this
+DEFAULT_HEDGE_DELAY = 4.0  # Until the primary has latency samples
+ERROR_PENALTY = 10.0  # Seconds added to the score per unit of recent error rate
+
+
+class ModelEndpoint:
+    """One model on one endpoint, with its own latency/error statistics"""
+
+    def __init__(self, model, url):
+        self.model = model
+        self.url = url
+        self.requests = 0
+        self.errors = 0
+        self.wins = 0  # Hedged races won
+        self.cancelled = 0  # Hedged races lost
+        self.retries = 0
+        self.breaker = CircuitBreaker()
+        self.latencies = collections.deque(maxlen=200)
+        self.censored = collections.deque(maxlen=50)  # Lower bounds: time until a lost race was cancelled
+        self.recent_errors = collections.deque(maxlen=50)  # 1 = error, 0 = success
+
+    def record(self, latency, ok):
+        self.requests += 1
+        self.recent_errors.append(0 if ok else 1)
+        if ok:
+            self.latencies.append(latency)
+        else:
+            self.errors += 1
+
+    def record_cancelled(self, elapsed):
+        """A lost race: neither a success nor an error, its real latency is only known to exceed `elapsed`"""
+        self.cancelled += 1
+        self.censored.append(elapsed)
+
+    def percentile(self, fraction, samples=None):
+        samples = self.latencies if samples is None else samples
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    @property
+    def error_rate(self):
+        return sum(self.recent_errors) / len(self.recent_errors) if self.recent_errors else 0.0
+
+    def score(self):
+        """Lower is better: median latency plus a penalty for recent errors.
+
+        Lost races count with their lower bound here only, so a slowed-down
+        primary doesn't stay first, without skewing the latency percentiles.
+        """
+        median = self.percentile(0.5, list(self.latencies) + list(self.censored) if self.censored else None)
+        return (median if median is not None else DEFAULT_HEDGE_DELAY) + ERROR_PENALTY * self.error_rate
+
+
+class ModelRouter:
+    """Ranks configured models by observed latency/errors and picks the hedge delay"""
+
+    def __init__(self, default_url, models=AI_MODELS):
+        self.endpoints = []
+        for entry in models.split(','):
+            entry = entry.strip()
+            if not entry:
+                continue
+            model, _, url = entry.partition('@')
+            self.endpoints.append(ModelEndpoint(model.strip(), url.strip() or default_url))
+        self.failed_fast = 0  # Requests answered without a call because every circuit was open
+
+    def ranked(self):
+        """Endpoints best-first, skipping open circuits; configuration order breaks ties (stable sort)"""
+        return sorted(
+            (endpoint for endpoint in self.endpoints if endpoint.breaker.available()),
+            key=lambda endpoint: endpoint.score()
+        )
+
+    def available(self):
+        """False while every endpoint's circuit is open"""
+        return any(endpoint.breaker.available() for endpoint in self.endpoints)
+
+    def hedge_delay(self, endpoint):
+        """Fire the backup once the primary is slower than its usual p95"""
+        p95 = endpoint.percentile(0.95)
+        if p95 is None:
+            p95 = DEFAULT_HEDGE_DELAY
+        return min(AI_HEDGE_MAX_DELAY, max(AI_HEDGE_MIN_DELAY, p95))
+
+    def stats(self):
+        return [
+            {
+                "model": endpoint.model,
+                "requests": endpoint.requests,
+                "errors": endpoint.errors,
+                "wins": endpoint.wins,
+                "cancelled": endpoint.cancelled,
+                "p50": endpoint.percentile(0.5),
+                "p95": endpoint.percentile(0.95),
+                "retries": endpoint.retries,
+                "breaker": endpoint.breaker.state,
+                "trips": endpoint.breaker.trips,
+                "retry_in": endpoint.breaker.retry_in()
+            }
+            for endpoint in self.endpoints
+        ]
+
+
+async def hedged_request(router, call):
+    """Run call(endpoint) against the best endpoint, hedging with the next one if it's slow.
+
+    A failed attempt immediately falls through to the next endpoint, a slow one
+    gets a parallel backup after the hedge delay. The first success wins and
+    all other attempts are cancelled. Raises the last error if every endpoint fails,
+    CircuitOpenError right away if every circuit is open.
+    """
+    candidates = router.ranked()
+    if not candidates:
+        router.failed_fast += 1
+        raise CircuitOpenError("all endpoints")
+    pending = {}  # task -> (endpoint, started)
+    last_error = None
+
+    def launch():
+        endpoint = candidates.pop(0)
+        task = asyncio.create_task(call(endpoint))
+        pending[task] = (endpoint, time.monotonic())
+        return endpoint
+
+    primary = launch()
+    hedge_at = time.monotonic() + router.hedge_delay(primary)
+    try:
+        while pending:
+            timeout = None
+            if candidates and hedge_at != float('inf'):
+                timeout = max(0.0, hedge_at - time.monotonic())
+            done, _ = await asyncio.wait(pending.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                # Primary is slow: fire the backup, race both
+                backup = launch()
+                hedge_at = float('inf')
+                logging.info(f"Hedging slow LLM request: {primary.model} -> {backup.model}")
+                continue
+
+            # Record every finished attempt with its real outcome (this also retrieves
+            # each exception) before a winner returns and cancels the rest
+            raced = len(pending) > 1
+            winner = None
+            for task in done:
+                endpoint, started = pending.pop(task)
+                latency = time.monotonic() - started
+                if task.exception() is None:
+                    endpoint.record(latency, True)
+                    if winner is None:
+                        winner = task, endpoint
+                    continue
+                last_error = task.exception()
+                if isinstance(last_error, CircuitOpenError):
+                    continue  # Never sent, not a latency/error sample
+                endpoint.record(latency, False)
+                logging.warning(f"LLM request to {endpoint.model} failed: {last_error}")
+
+            if winner is not None:
+                task, endpoint = winner
+                if raced or endpoint is not primary:
+                    endpoint.wins += 1
+                return task.result()
+
+            # Failure: fall back to the next endpoint right away
+            if candidates and not pending:
+                primary = launch()
+                hedge_at = time.monotonic() + router.hedge_delay(primary)
+    finally:
+        for task, (endpoint, started) in pending.items():
+            task.cancel()
+            endpoint.record_cancelled(time.monotonic() - started)
+
+    raise last_error
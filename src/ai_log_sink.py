@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import asyncio
+import logging
+import os
+
+import discord
+
+AI_LOG_WEBHOOK_URL = os.getenv('AI_LOG_WEBHOOK_URL', '')  # Optional: separate rate-limit bucket
+LOG_SINK_MAX_QUEUE = 500  # Embeds buffered before new ones are dropped
+LOG_SINK_BATCH_SIZE = 10  # Discord allows 10 embeds per message
+LOG_SINK_FLUSH_INTERVAL = 5.0  # Seconds a partial batch may wait
+LOG_MESSAGE_MAX_CHARS = 6000  # Discord's limit for all embeds of one message together
+LOG_DESCRIPTION_MAX = 2000  # Longer prompts/replies are cut, so at least two fit per message
+
+
+class InteractionLogSink:
+    """Buffers AI interaction embeds and sends them to the logging channel in batches.
+
+    Up to 10 embeds (and at most 6000 characters) are packed into one message,
+    flushed when a batch is full or after a few seconds. With AI_LOG_WEBHOOK_URL set, batches go through
+    a webhook and don't touch the bot's own rate limits. When the buffer is
+    full new records are dropped and reported as a summary embed.
+    """
+
+    def __init__(self, client, webhook_url=AI_LOG_WEBHOOK_URL):
+        self.client = client
+        self.webhook_url = webhook_url
+        self.queue = None
+        self.task = None
+        self.closed = False
+        self.batch = []  # Batch being built, flushed by close() too
+        self.batch_chars = 0
+        self.deadline = 0.0
+        self.dropped = 0
+        self.sent_messages = 0
+        self.sent_embeds = 0
+
+    def submit(self, embed):
+        """Queue an embed without waiting, drops it if the buffer is full"""
+        if self.closed:
+            return
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=LOG_SINK_MAX_QUEUE)
+            self.task = asyncio.create_task(self._run())
+        if embed.description and len(embed.description) > LOG_DESCRIPTION_MAX:
+            embed.description = embed.description[:LOG_DESCRIPTION_MAX - 3] + "..."
+        try:
+            self.queue.put_nowait(embed)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def close(self):
+        """Flush everything still buffered and stop the sender (call before the bot closes)"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.task is None:
+            return
+        # The sentinel queues up behind everything already submitted
+        await self.queue.put(None)
+        await self.task
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            timeout = max(0.0, self.deadline - loop.time()) if self.batch else None
+            try:
+                embed = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                await self._flush()
+                continue
+            if embed is None:
+                await self._flush()
+                return
+
+            size = len(embed)
+            if self.batch and self.batch_chars + size > LOG_MESSAGE_MAX_CHARS:
+                await self._flush()
+            if not self.batch:
+                self.deadline = loop.time() + LOG_SINK_FLUSH_INTERVAL
+            self.batch.append(embed)
+            self.batch_chars += size
+            if len(self.batch) >= LOG_SINK_BATCH_SIZE:
+                await self._flush()
+
+    async def _flush(self):
+        batch, batch_chars = self.batch, self.batch_chars
+        self.batch = []
+        self.batch_chars = 0
+        await self._send(batch, batch_chars)
+
+    async def _send(self, batch, batch_chars=0):
+        if self.dropped:
+            summary = discord.Embed(
+                title="⚠️ AI Log Overload",
+                description=f"{self.dropped} interaction log entries were dropped because the log buffer was full.",
+                color=0xe67e22,
+                timestamp=discord.utils.utcnow()
+            )
+            self.dropped = 0
+            if len(batch) < LOG_SINK_BATCH_SIZE and batch_chars + len(summary) <= LOG_MESSAGE_MAX_CHARS:
+                batch = batch + [summary]
+            else:
+                await self._send_embeds([summary])
+        if batch:
+            await self._send_embeds(batch)
+
+    async def _send_embeds(self, embeds):
+        try:
+            if self.webhook_url:
+                webhook = discord.Webhook.from_url(self.webhook_url, session=self.client.http_clients.get("discord_webhook"))
+                await webhook.send(embeds=embeds, username="FCKR AI Log")
+            else:
+                logging_channel = self.client.get_channel(self.client.logging_channel)
+                if not logging_channel:
+                    return
+                await logging_channel.send(embeds=embeds)
+            self.sent_messages += 1
+            self.sent_embeds += len(embeds)
+        except Exception as e:
+            logging.error(f"Error sending AI interaction log batch: {str(e)}")
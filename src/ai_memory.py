@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import array
+import logging
+import math
+import os
+import re
+import zlib
+
+import numpy as np
+
+from interaction import Interaction
+
+AI_LONG_TERM_MEMORY = os.getenv('AI_LONG_TERM_MEMORY', 'true').lower() in ('1', 'true', 'yes')
+MEMORY_DIM = int(os.getenv('AI_MEMORY_DIM', 256))  # Hashed feature buckets per interaction
+MEMORY_TOP_K = int(os.getenv('AI_MEMORY_TOP_K', 4))  # Relevant past exchanges injected per request
+MEMORY_RECENT_TURNS = int(os.getenv('AI_MEMORY_RECENT_TURNS', 3))  # Newest turns always sent verbatim
+MEMORY_MIN_SCORE = 0.1  # Cosine similarity below which a past exchange isn't relevant
+GROW_ROWS = 65536  # Rows added to the memory-mapped files at a time
+SCORE_CHUNK_ROWS = 16384  # Rows converted to float32 at once while scoring
+
+TOKEN_PATTERN = re.compile(r"\w+")
+RECORD_DTYPE = np.dtype([('user_id', '<i8'), ('offset', '<i8'), ('user_len', '<u4'), ('bot_len', '<u4'), ('timestamp', '<i8')])
+
+
+class HashedTfidf:
+    """Online TF-IDF over hashed tokens (the hashing trick), no vocabulary to store.
+
+    Tokens are hashed into `dim` buckets with a sign bit to cancel collisions
+    out on average. Document frequencies are learned as interactions come in,
+    so IDF weights reflect the corpus seen so far when a row is stored.
+    """
+
+    def __init__(self, df):
+        self.df = df  # int64 [dim + 1], last slot is the document count
+        self.dim = len(df) - 1
+
+    def _counts(self, text):
+        counts = {}
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            h = zlib.crc32(token.encode('utf-8'))
+            bucket = h % self.dim
+            counts[bucket] = counts.get(bucket, 0) + (1 if h & 0x80000000 else -1)
+        return counts
+
+    def vectorize(self, text, learn=False):
+        """L2-normalized float32 TF-IDF vector; learn=True also updates document frequencies"""
+        counts = self._counts(text)
+        if learn:
+            self.df[-1] += 1
+            for bucket in counts:
+                self.df[bucket] += 1
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        docs = self.df[-1]
+        for bucket, count in counts.items():
+            if count:
+                idf = math.log((1 + docs) / (1 + self.df[bucket])) + 1
+                vector[bucket] = math.copysign(1 + math.log(abs(count)), count) * idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class LongTermMemory:
+    """Every past interaction of every user, vectorized for top-k relevance search.
+
+    On disk (per vector size, in `directory/d<dim>`): float16 vectors and
+    fixed 32-byte records as memory-mapped files, the texts as one append-only
+    file and the vectorizer's document frequencies. Only a per-user row index
+    lives on the heap; texts are read back just for the hits.
+
+    search() may run in a worker thread while add() runs on the event loop: a
+    row joins the user's index only after its vector, record and text are written.
+    """
+
+    def __init__(self, directory, dim=MEMORY_DIM):
+        self.dim = dim
+        self.directory = os.path.join(directory, f"d{dim}")
+        os.makedirs(self.directory, exist_ok=True)
+        self.vectors_path = os.path.join(self.directory, 'vectors.f16')
+        self.records_path = os.path.join(self.directory, 'records.bin')
+        self.texts_path = os.path.join(self.directory, 'texts.bin')
+        self.df_path = os.path.join(self.directory, 'df.bin')
+
+        self.df = self._map(self.df_path, np.int64, (dim + 1,))
+        self.vectorizer = HashedTfidf(self.df)
+        self.capacity = 0
+        self.vectors = None
+        self.records = None
+        self._resize(max(GROW_ROWS, self._file_rows()))
+
+        # Rows are written in order, unused rows have timestamp 0
+        self.count = int(np.count_nonzero(self.records['timestamp']))
+        self.texts = open(self.texts_path, 'ab')
+        self.text_end = self.texts.tell()
+        self.texts_fd = os.open(self.texts_path, os.O_RDONLY)
+
+        # user_id -> row numbers (4 bytes each), oldest first
+        self.users = {}
+        if self.count:
+            user_ids = self.records['user_id'][:self.count]
+            order = np.argsort(user_ids, kind='stable')
+            boundaries = np.flatnonzero(np.diff(user_ids[order])) + 1
+            for rows in np.split(order, boundaries):
+                user_rows = array.array('I')
+                user_rows.frombytes(rows.astype(np.uint32).tobytes())
+                self.users[int(user_ids[rows[0]])] = user_rows
+        logging.info(f"Long-term memory ready with {self.count} interactions of {len(self.users)} users")
+
+    @staticmethod
+    def _map(path, dtype, shape):
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(path, 'ab') as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(path, dtype=dtype, mode='r+', shape=shape)
+
+    def _file_rows(self):
+        if not os.path.exists(self.records_path):
+            return 0
+        return os.path.getsize(self.records_path) // RECORD_DTYPE.itemsize
+
+    def _resize(self, capacity):
+        if self.vectors is not None:
+            self.vectors.flush()
+            self.records.flush()
+        self.capacity = capacity
+        self.vectors = self._map(self.vectors_path, np.float16, (capacity, self.dim))
+        self.records = self._map(self.records_path, RECORD_DTYPE, (capacity,))
+
+    def add(self, user_id, entry):
+        """Vectorize and store one interaction (page-cache writes, no fsync)"""
+        user_text = entry.user_message.encode('utf-8')
+        bot_text = entry.bot_response.encode('utf-8')
+        if self.count == self.capacity:
+            self._resize(self.capacity + GROW_ROWS)
+
+        row = self.count
+        self.vectors[row] = self.vectorizer.vectorize(entry.user_message + "\n" + entry.bot_response, learn=True)
+        self.records[row] = (
+            user_id,
+            self.text_end,
+            len(user_text),
+            len(bot_text),
+            max(1, entry.timestamp)
+        )
+        self.texts.write(user_text + bot_text)
+        self.texts.flush()
+        self.text_end += len(user_text) + len(bot_text)
+        self.count += 1
+        self.users.setdefault(user_id, array.array('I')).append(row)
+
+    def import_entries(self, interactions):
+        """Bulk add (user_id, entry) pairs, e.g. to backfill from the session store"""
+        imported = 0
+        for user_id, entry in interactions:
+            self.add(user_id, entry)
+            imported += 1
+        return imported
+
+    def scores(self, rows, query_vector):
+        """Cosine similarity of the given rows to a normalized query vector"""
+        result = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), SCORE_CHUNK_ROWS):
+            chunk = rows[start:start + SCORE_CHUNK_ROWS]
+            result[start:start + len(chunk)] = self.vectors[chunk].astype(np.float32) @ query_vector
+        return result
+
+    def search(self, user_id, query, k=MEMORY_TOP_K, skip_recent=0):
+        """Top-k past exchanges of a user most similar to query, oldest first.
+
+        The newest skip_recent interactions are left out (they're sent verbatim anyway).
+        """
+        rows = self.users.get(user_id)
+        if not rows or k <= 0 or len(rows) <= skip_recent:
+            return []
+        candidates = np.asarray(rows[:len(rows) - skip_recent], dtype=np.int64)
+        query_vector = self.vectorizer.vectorize(query)
+        if not query_vector.any():
+            return []
+
+        scores = self.scores(candidates, query_vector)
+        if len(candidates) > k:
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(candidates))
+        hits = sorted(int(candidates[i]) for i in top if scores[i] >= MEMORY_MIN_SCORE)
+        return [entry for entry in (self.read(row) for row in hits) if entry]
+
+    def read(self, row):
+        """Stored interaction, None if its text is missing"""
+        record = self.records[row]
+        user_len, bot_len = int(record['user_len']), int(record['bot_len'])
+        data = os.pread(self.texts_fd, user_len + bot_len, int(record['offset']))
+        if len(data) < user_len + bot_len:
+            return None
+        return Interaction(
+            int(record['timestamp']),
+            data[:user_len].decode('utf-8', errors='replace'),
+            data[user_len:].decode('utf-8', errors='replace')
+        )
+
+    def close(self):
+        self.vectors.flush()
+        self.records.flush()
+        self.df.flush()
+        self.texts.close()
+        os.close(self.texts_fd)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import array
+import bisect
+import logging
+import os
+import struct
+import time
+
+# Latency histogram bucket upper bounds in seconds (last bucket catches everything above)
+LATENCY_BUCKETS = (0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0, 15.0, 20.0, 30.0, float('inf'))
+TIMESERIES_MINUTES = 1440  # One slot per minute, 24h ring
+
+FILE_MAGIC = b'FCKRTS1\0'
+FILE_HEADER = struct.Struct('<8sII')  # magic, slots, buckets
+
+
+def format_latency(bound):
+    """Display a percentile bucket bound: "≤2s", ">30s" for the overflow bucket, "-" without data"""
+    if bound is None:
+        return "-"
+    if bound == float('inf'):
+        return f">{LATENCY_BUCKETS[-2]:g}s"
+    return f"≤{bound:g}s"
+
+
+class MetricsTimeSeries:
+    """Fixed-size per-minute ring of request counts, error counts and latency histograms.
+
+    Everything lives in flat array.array columns, so recording is O(1),
+    percentiles over a window never touch per-user data and the whole
+    store is persisted as one small binary file.
+    """
+
+    def __init__(self, path, slots=TIMESERIES_MINUTES):
+        self.path = path
+        self.slots = slots
+        self.buckets = len(LATENCY_BUCKETS)
+        self.minutes = array.array('q', [-1]) * slots  # Epoch minute each slot currently holds
+        self.requests = array.array('I', [0]) * slots
+        self.errors = array.array('I', [0]) * slots
+        self.latency = array.array('I', [0]) * (slots * self.buckets)
+        self.load()
+
+    def _slot(self, minute):
+        """Slot for an epoch minute, cleared if it still holds an older minute"""
+        slot = minute % self.slots
+        if self.minutes[slot] != minute:
+            self.minutes[slot] = minute
+            self.requests[slot] = 0
+            self.errors[slot] = 0
+            base = slot * self.buckets
+            for i in range(base, base + self.buckets):
+                self.latency[i] = 0
+        return slot
+
+    def record(self, latency, ok=True, now=None):
+        """Record one LLM request"""
+        minute = int((time.time() if now is None else now) // 60)
+        slot = self._slot(minute)
+        self.requests[slot] += 1
+        if ok:
+            bucket = bisect.bisect_left(LATENCY_BUCKETS, latency)
+            self.latency[slot * self.buckets + bucket] += 1
+        else:
+            self.errors[slot] += 1
+
+    def summary(self, window_minutes, now=None):
+        """Requests, errors and p50/p95 latency (bucket upper bounds) over the last window"""
+        current = int((time.time() if now is None else now) // 60)
+        requests = errors = 0
+        histogram = [0] * self.buckets
+        for minute in range(current - min(window_minutes, self.slots) + 1, current + 1):
+            slot = minute % self.slots
+            if self.minutes[slot] != minute:
+                continue
+            requests += self.requests[slot]
+            errors += self.errors[slot]
+            base = slot * self.buckets
+            for bucket in range(self.buckets):
+                histogram[bucket] += self.latency[base + bucket]
+
+        return {
+            "requests": requests,
+            "errors": errors,
+            "p50": self._percentile(histogram, 0.5),
+            "p95": self._percentile(histogram, 0.95)
+        }
+
+    @staticmethod
+    def _percentile(histogram, fraction):
+        total = sum(histogram)
+        if not total:
+            return None
+        target = fraction * total
+        seen = 0
+        for bucket, count in enumerate(histogram):
+            seen += count
+            if seen >= target:
+                return LATENCY_BUCKETS[bucket]
+        return LATENCY_BUCKETS[-1]
+
+    def to_bytes(self):
+        """Serialize header + columns (cheap memory copies, safe to write from another thread)"""
+        return b''.join((
+            FILE_HEADER.pack(FILE_MAGIC, self.slots, self.buckets),
+            self.minutes.tobytes(),
+            self.requests.tobytes(),
+            self.errors.tobytes(),
+            self.latency.tobytes()
+        ))
+
+    def load(self):
+        """Load the ring from disk, ignoring files with another layout"""
+        try:
+            if not os.path.exists(self.path):
+                return
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            magic, slots, buckets = FILE_HEADER.unpack_from(data)
+            if magic != FILE_MAGIC or slots != self.slots or buckets != self.buckets:
+                logging.warning("Ignoring AI metrics time series with different layout")
+                return
+
+            offset = FILE_HEADER.size
+            for column in (self.minutes, self.requests, self.errors, self.latency):
+                size = len(column) * column.itemsize
+                column[:] = array.array(column.typecode, data[offset:offset + size])
+                offset += size
+        except Exception as e:
+            logging.error(f"Error loading AI metrics time series: {str(e)}")
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import logging
+
+
+class UserRequestQueue:
+    """Serializes chatbot requests per user and coalesces bursts.
+
+    The first request of a user runs immediately. Requests arriving while it
+    is in flight are collected and answered together with a single LLM call
+    once the previous interaction has been committed, so every call sees the
+    up-to-date history and replies stay in order.
+    """
+
+    def __init__(self, process):
+        self.process = process  # async process(batch) with batch = [(message, prompt), ...]
+        self.pending = {}  # user_id -> [(message, prompt), ...] waiting for the active request
+        self.active = set()  # user_ids with a request in flight
+        self.requests = 0
+        self.batches = 0
+        self.coalesced = 0  # Requests merged into another call (API calls saved)
+
+    async def submit(self, user_id, message, prompt):
+        """Queue a request, the caller that finds the user idle drives the queue"""
+        self.requests += 1
+        self.pending.setdefault(user_id, []).append((message, prompt))
+        if user_id in self.active:
+            return
+
+        self.active.add(user_id)
+        try:
+            while self.pending.get(user_id):
+                batch = self.pending.pop(user_id)
+                self.batches += 1
+                self.coalesced += len(batch) - 1
+                try:
+                    await self.process(batch)
+                except Exception as e:
+                    logging.error(f"Error processing AI request batch for user {user_id}: {str(e)}")
+        finally:
+            self.active.discard(user_id)
+            self.pending.pop(user_id, None)
+
+    def depth(self, user_id):
+        """Requests waiting behind the in-flight one for a user"""
+        return len(self.pending.get(user_id, ()))
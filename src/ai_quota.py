@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import array
+import datetime
+import json
+import logging
+import os
+import time
+
+AI_DAILY_REQUEST_BUDGET = int(os.getenv('AI_DAILY_REQUEST_BUDGET', 1000))  # Provider requests per UTC day
+AI_DAILY_TOKEN_BUDGET = int(os.getenv('AI_DAILY_TOKEN_BUDGET', 0))  # Tokens per UTC day, 0 = only tracked
+QUOTA_RESERVE = 0.02  # Share of the budget kept back for in-flight requests, never handed out
+MIN_USER_LIMIT = 3  # Per-user hourly limit never drops below this while budget is left
+BURN_WINDOW_MINUTES = 60  # Recent usage the forecast extrapolates from
+UPDATE_INTERVAL = 60  # Seconds between adaptive limit recalculations
+SAVE_INTERVAL = 30  # Seconds of counters a crash may lose
+
+
+class QuotaGovernor:
+    """Daily provider budget: counts requests and `usage` tokens per UTC day.
+
+    Counters are persisted (provider quotas reset at 00:00 UTC, not on our
+    restarts). From the last hour's burn rate it forecasts whether the budget
+    lasts until the reset and scales the per-user hourly limit down so it
+    does, instead of running into hard provider 429s at the evening peak.
+    """
+
+    def __init__(self, path, base_user_limit, daily_requests=AI_DAILY_REQUEST_BUDGET, daily_tokens=AI_DAILY_TOKEN_BUDGET):
+        self.path = path
+        self.base_user_limit = base_user_limit
+        self.daily_requests = daily_requests
+        self.daily_tokens = daily_tokens
+        self.day = None
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.denied = 0
+
+        # Per-minute ring of the last hour: epoch minute, requests, tokens
+        self.minutes = array.array('q', [-1]) * BURN_WINDOW_MINUTES
+        self.minute_requests = array.array('I', [0]) * BURN_WINDOW_MINUTES
+        self.minute_tokens = array.array('I', [0]) * BURN_WINDOW_MINUTES
+
+        self.user_limit = base_user_limit
+        self.last_update = 0.0
+        self.last_save = time.time()
+        self.load()
+
+    @staticmethod
+    def _day(now):
+        return datetime.datetime.fromtimestamp(now, datetime.timezone.utc).strftime('%Y-%m-%d')
+
+    def _roll(self, now):
+        """Start fresh counters when the UTC day changed"""
+        day = self._day(now)
+        if day != self.day:
+            self.day = day
+            self.requests = self.prompt_tokens = self.completion_tokens = self.denied = 0
+
+    def seconds_until_reset(self, now=None):
+        now = time.time() if now is None else now
+        return 86400 - now % 86400
+
+    def _slot(self, now):
+        """Ring slot of the current minute, cleared when it's reused"""
+        minute = int(now // 60)
+        slot = minute % BURN_WINDOW_MINUTES
+        if self.minutes[slot] != minute:
+            self.minutes[slot] = minute
+            self.minute_requests[slot] = 0
+            self.minute_tokens[slot] = 0
+        return slot
+
+    def record_request(self, now=None):
+        """Count one request sent to the provider: every attempt, retries and hedges included"""
+        now = time.time() if now is None else now
+        self._roll(now)
+        self.requests += 1
+        self.minute_requests[self._slot(now)] += 1
+        self._maybe_save(now)
+
+    def record_tokens(self, prompt_tokens=0, completion_tokens=0, now=None):
+        """Add the tokens of a completed request"""
+        now = time.time() if now is None else now
+        self._roll(now)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.minute_tokens[self._slot(now)] += prompt_tokens + completion_tokens
+        self._maybe_save(now)
+
+    def burn_rate(self, now=None):
+        """(requests, tokens) per hour over the last hour"""
+        current = int((time.time() if now is None else now) // 60)
+        requests = tokens = 0
+        for slot in range(BURN_WINDOW_MINUTES):
+            if current - BURN_WINDOW_MINUTES < self.minutes[slot] <= current:
+                requests += self.minute_requests[slot]
+                tokens += self.minute_tokens[slot]
+        return requests, tokens
+
+    def remaining(self, now=None):
+        """(requests, tokens) left today before the reserve; tokens is None without a token budget"""
+        self._roll(time.time() if now is None else now)
+        requests = self.daily_requests * (1 - QUOTA_RESERVE) - self.requests
+        tokens = None
+        if self.daily_tokens:
+            tokens = self.daily_tokens * (1 - QUOTA_RESERVE) - self.prompt_tokens - self.completion_tokens
+        return requests, tokens
+
+    def exhausted(self, now=None):
+        requests, tokens = self.remaining(now)
+        return requests <= 0 or (tokens is not None and tokens <= 0)
+
+    def forecast(self, now=None):
+        """Seconds until the budget runs out at the current burn rate, None if it lasts until the reset"""
+        now = time.time() if now is None else now
+        requests_left, tokens_left = self.remaining(now)
+        request_rate, token_rate = self.burn_rate(now)
+        candidates = []
+        if request_rate:
+            candidates.append(max(0.0, requests_left) / request_rate * 3600)
+        if tokens_left is not None and token_rate:
+            candidates.append(max(0.0, tokens_left) / token_rate * 3600)
+        if not candidates or min(candidates) >= self.seconds_until_reset(now):
+            return None
+        return min(candidates)
+
+    def allow(self, now=None):
+        """Global gate in front of the per-user limits"""
+        if self.exhausted(now):
+            self.denied += 1
+            return False
+        return True
+
+    def update(self, policy, now=None):
+        """Recompute the adaptive per-user limit (at most once a minute) and apply it to the policy"""
+        now = time.time() if now is None else now
+        if now - self.last_update < UPDATE_INTERVAL:
+            return
+        self.last_update = now
+
+        limit = self.base_user_limit
+        lasts = self.forecast(now)
+        if lasts is not None:
+            # Demand would drain the budget early: scale users down to stretch it to the reset
+            limit = max(MIN_USER_LIMIT, int(self.base_user_limit * lasts / self.seconds_until_reset(now)))
+        if limit != self.user_limit:
+            logging.info(f"Quota governor: per-user limit {self.user_limit} -> {limit}/hour")
+            self.user_limit = limit
+        if policy.limit != limit:
+            policy.set_limit(limit)
+
+    def stats(self, now=None):
+        now = time.time() if now is None else now
+        requests_left, tokens_left = self.remaining(now)
+        request_rate, token_rate = self.burn_rate(now)
+        return {
+            "day": self.day,
+            "requests": self.requests,
+            "daily_requests": self.daily_requests,
+            "tokens": self.prompt_tokens + self.completion_tokens,
+            "daily_tokens": self.daily_tokens,
+            "requests_left": max(0, int(requests_left)),
+            "tokens_left": None if tokens_left is None else max(0, int(tokens_left)),
+            "request_rate": request_rate,
+            "token_rate": token_rate,
+            "exhausted_in": self.forecast(now),
+            "reset_in": self.seconds_until_reset(now),
+            "user_limit": self.user_limit,
+            "denied": self.denied
+        }
+
+    def to_bytes(self):
+        return json.dumps({
+            "day": self.day,
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "denied": self.denied
+        }).encode('utf-8')
+
+    def _maybe_save(self, now):
+        if now - self.last_save >= SAVE_INTERVAL:
+            self.save(now)
+
+    def save(self, now=None):
+        """Atomically write today's counters (a few hundred bytes, fine on the event loop)"""
+        self.last_save = time.time() if now is None else now
+        tmp_path = self.path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(self.to_bytes())
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Error saving quota counters: {str(e)}")
+
+    def load(self):
+        """Restore today's counters, yesterday's file starts a fresh day"""
+        self._roll(time.time())
+        try:
+            if not os.path.exists(self.path):
+                return
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get("day") == self.day:
+                self.requests = saved.get("requests", 0)
+                self.prompt_tokens = saved.get("prompt_tokens", 0)
+                self.completion_tokens = saved.get("completion_tokens", 0)
+                self.denied = saved.get("denied", 0)
+                logging.info(f"Loaded daily quota counters - Requests: {self.requests}/{self.daily_requests}")
+        except Exception as e:
+            logging.error(f"Error loading quota counters: {str(e)}")
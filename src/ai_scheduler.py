@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import asyncio
+import collections
+import heapq
+import itertools
+import os
+import time
+
+# Priority lanes (lower runs first)
+PRIORITY_OWNER = 0  # ADMIN_USER_ID
+PRIORITY_ADMIN = 1  # Bot admins
+PRIORITY_USER = 2
+
+# Scheduler configuration
+AI_MAX_CONCURRENCY = int(os.getenv('AI_MAX_CONCURRENCY', 4))  # Parallel OpenRouter requests
+AI_MAX_QUEUE = int(os.getenv('AI_MAX_QUEUE', 50))  # Requests allowed to wait for a slot
+AI_MAX_WAIT = float(os.getenv('AI_MAX_WAIT', 30))  # Seconds a request may wait before it's shed
+
+
+class LLMScheduler:
+    """Bounded concurrency for outbound LLM calls with priority lanes and load shedding.
+
+    At most max_concurrency calls run at once, up to max_queue wait in a
+    priority heap. Requests that would clearly wait longer than max_wait
+    (estimated from the average call duration) are shed right away.
+    """
+
+    def __init__(self, max_concurrency=AI_MAX_CONCURRENCY, max_queue=AI_MAX_QUEUE, max_wait=AI_MAX_WAIT):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.running = 0
+        self.waiters = []  # Heap of (priority, seq, future)
+        self.depth = 0  # Live waiters (cancelled ones stay in the heap until popped)
+        self.sequence = itertools.count()
+        self.avg_service_time = 3.0  # EWMA of call duration in seconds
+
+        # Metrics
+        self.granted = 0
+        self.shed = 0
+        self.max_depth = 0
+        self.wait_times = collections.deque(maxlen=500)
+
+    async def acquire(self, priority=PRIORITY_USER):
+        """Wait for a slot, returns False if the request was shed"""
+        if self.running < self.max_concurrency and self.depth == 0:
+            self.running += 1
+            self._granted(0.0)
+            return True
+
+        if self.depth >= self.max_queue or self.estimated_wait(priority) > self.max_wait:
+            self.shed += 1
+            return False
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.sequence), future))
+        self.depth += 1
+        self.max_depth = max(self.max_depth, self.depth)
+
+        try:
+            await asyncio.wait({future}, timeout=self.max_wait)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # Slot was handed to us just before cancellation
+            else:
+                self._abandon(future)
+            raise
+
+        if future.done() and not future.cancelled():
+            self._granted(time.monotonic() - started)
+            return True
+
+        self._abandon(future)
+        self.shed += 1
+        return False
+
+    def release(self, service_time=None):
+        """Free a slot, handing it straight to the highest-priority waiter"""
+        if service_time is not None:
+            self.avg_service_time = 0.8 * self.avg_service_time + 0.2 * service_time
+
+        while self.waiters:
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                self.depth -= 1
+                future.set_result(True)
+                return
+        self.running -= 1
+
+    def estimated_wait(self, priority):
+        """Rough wait estimate: rounds of calls ahead of us times the average call duration"""
+        ahead = sum(1 for waiter in self.waiters if waiter[0] <= priority and not waiter[2].done())
+        return (ahead // self.max_concurrency + 1) * self.avg_service_time
+
+    def _abandon(self, future):
+        future.cancel()
+        self.depth -= 1
+
+    def _granted(self, wait_time):
+        self.granted += 1
+        self.wait_times.append(wait_time)
+
+    def stats(self):
+        """Queue depth and wait-time metrics"""
+        waits = sorted(self.wait_times)
+        return {
+            "running": self.running,
+            "queue_depth": self.depth,
+            "max_queue_depth": self.max_depth,
+            "granted": self.granted,
+            "shed": self.shed,
+            "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+            "p95_wait": waits[int(len(waits) * 0.95)] if waits else 0.0,
+            "avg_service_time": self.avg_service_time
+        }
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import asyncio
+import json
+import logging
+import re
+import time
+
+from rate_limiter import RatePolicy
+
+# Discord allows roughly 5 message edits per 5 seconds per channel, stay well below
+STREAM_EDIT_INTERVAL = 1.5  # Seconds between progressive edits of one reply
+CHANNEL_EDIT_INTERVAL = 1.25  # Seconds between edits across all replies streaming in one channel (4 per 5s, no bursts)
+FIRST_SEND_MAX_CHARS = 200  # Send early even without a sentence end once this much text arrived
+DISCORD_MESSAGE_LIMIT = 2000
+
+SENTENCE_END = re.compile(r'[.!?…](\s|$)|\n')
+
+# Shared by every ProgressiveReply, keyed by channel ID (monotonic clock)
+channel_edits = RatePolicy("stream_edits", 1, CHANNEL_EDIT_INTERVAL)
+final_edits = set()  # Final edits waiting for their channel's budget, referenced until done
+
+
+async def iter_sse_deltas(response):
+    """Yield content deltas from an OpenAI-style server-sent events response"""
+    async for raw_line in response.content:
+        line = raw_line.decode('utf-8', errors='replace').strip()
+        # Skip keep-alive comments (e.g. ": OPENROUTER PROCESSING") and blank separators
+        if not line or line.startswith(':') or not line.startswith('data:'):
+            continue
+
+        data = line[5:].strip()
+        if data == '[DONE]':
+            return
+
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            logging.warning(f"Skipping malformed SSE chunk: {data[:100]}")
+            continue
+
+        choices = chunk.get('choices') or []
+        if choices:
+            delta = (choices[0].get('delta') or {}).get('content')
+            if delta:
+                yield delta
+
+
+class ProgressiveReply:
+    """Replies as soon as the first sentence is ready, then edits in coalesced chunks.
+
+    Edits are spaced per reply and budgeted per channel, so concurrent streams
+    in one channel share Discord's edit rate limit instead of hitting 429s.
+    """
+
+    def __init__(self, message, edit_interval=STREAM_EDIT_INTERVAL, edit_policy=channel_edits):
+        self.message = message
+        self.edit_interval = edit_interval
+        self.edit_policy = edit_policy
+        self.channel_id = message.channel.id
+        self.text = ""
+        self.shown = ""
+        self.reply = None
+        self.last_edit = 0.0
+        self.edits = 0
+        self.throttled = 0  # Edits skipped or delayed for the channel budget
+        self.started = time.monotonic()
+        self.first_send_latency = None
+
+    async def feed(self, delta):
+        """Add a streamed delta and update Discord if it's time to"""
+        self.text += delta
+        if self.reply is None:
+            if SENTENCE_END.search(self.text) or len(self.text) >= FIRST_SEND_MAX_CHARS:
+                await self._send()
+        elif time.monotonic() - self.last_edit >= self.edit_interval and self.text[:DISCORD_MESSAGE_LIMIT] != self.shown:
+            # Channel busy with other streams: skip, a later delta tries again
+            if self._take_edit()[0]:
+                await self._edit()
+            else:
+                self.throttled += 1
+
+    async def finish(self):
+        """Flush the remaining text, returns the full response.
+
+        The final edit waits for the channel's edit budget in a background task,
+        so the caller (and its scheduler slot) is free as soon as generation ends.
+        """
+        self.text = self.text.strip()
+        if not self.text:
+            self.text = "oops, something broke. probably not my fault though ^^"
+        if self.reply is None:
+            await self._send()
+        elif self.shown != self.text[:DISCORD_MESSAGE_LIMIT]:
+            task = asyncio.create_task(self._final_edit())
+            final_edits.add(task)
+            task.add_done_callback(final_edits.discard)
+        return self.text
+
+    async def _final_edit(self):
+        """The final edit must happen: wait for the channel budget"""
+        allowed, retry_after = self._take_edit()
+        while not allowed:
+            self.throttled += 1
+            await asyncio.sleep(retry_after)
+            allowed, retry_after = self._take_edit()
+        await self._edit()
+
+    def _take_edit(self):
+        """(allowed, retry_after): counts an edit against the channel budget if there's room"""
+        now = time.monotonic()
+        allowed, retry_after, new_tat = self.edit_policy.peek(self.channel_id, now)
+        if allowed:
+            self.edit_policy.commit(self.channel_id, new_tat, now)
+        return allowed, retry_after
+
+    async def _send(self):
+        self.shown = self.text[:DISCORD_MESSAGE_LIMIT]
+        self.reply = await self.message.reply(self.shown)
+        self.last_edit = time.monotonic()
+        self.first_send_latency = self.last_edit - self.started
+
+    async def _edit(self):
+        content = self.text[:DISCORD_MESSAGE_LIMIT]
+        if content == self.shown:
+            return
+        try:
+            await self.reply.edit(content=content)
+            self.shown = content
+            self.edits += 1
+        except Exception as e:
+            logging.error(f"Error editing streamed reply: {str(e)}")
+        self.last_edit = time.monotonic()
+
+
+async def stream_reply(ai_client, message, prompt, character_context, chat_history=None, backend=None):
+    """Stream a response into a progressively edited Discord reply, returns the full text"""
+    progressive = ProgressiveReply(message)
+    async for delta in ai_client.stream_response(prompt, character_context, chat_history, backend):
+        await progressive.feed(delta)
+    response = await progressive.finish()
+    logging.info(f"Streamed reply: first send after {progressive.first_send_latency:.2f}s, {progressive.edits} edits ({progressive.throttled} throttled)")
+    return response
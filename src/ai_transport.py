@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import asyncio
+import email.utils
+import logging
+import os
+import random
+import time
+
+import aiohttp
+
+AI_REQUEST_DEADLINE = float(os.getenv('AI_REQUEST_DEADLINE', 30))  # Seconds for one completion incl. retries
+AI_MAX_RETRIES = int(os.getenv('AI_MAX_RETRIES', 2))  # Retries per endpoint on 429/5xx/timeouts
+AI_BREAKER_THRESHOLD = int(os.getenv('AI_BREAKER_THRESHOLD', 5))  # Consecutive failures that open the circuit
+AI_BREAKER_COOLDOWN = float(os.getenv('AI_BREAKER_COOLDOWN', 30))  # Seconds before a half-open probe
+RETRY_BASE_DELAY = 0.5  # Full-jitter backoff base
+RETRY_MAX_DELAY = 10.0  # Never wait longer than this, even if Retry-After asks for it
+
+RETRYABLE_STATUS = (408, 429, 500, 502, 503, 504)
+
+
+class LLMRequestError(Exception):
+    """Non-200 answer from an LLM endpoint"""
+
+    def __init__(self, status, text="", retry_after=None):
+        super().__init__(f"HTTP {status}: {text[:200]}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """Every endpoint's circuit is open, the request was not sent"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with single half-open probes.
+
+    closed: requests pass, failures are counted. open: requests fail fast
+    until the cooldown has passed. half_open: one probe request is let
+    through, its outcome closes or reopens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold=AI_BREAKER_THRESHOLD, cooldown=AI_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.trips = 0
+        self.rejected = 0
+
+    def available(self, now=None):
+        """Would a request be let through right now (doesn't claim the probe)"""
+        if self.state == self.CLOSED:
+            return True
+        if self.probing:
+            return False
+        return (time.monotonic() if now is None else now) - self.opened_at >= self.cooldown
+
+    def before_request(self, now=None):
+        """Claim permission to send, False means fail fast"""
+        if self.state == self.CLOSED:
+            return True
+        if not self.available(now):
+            self.rejected += 1
+            return False
+        self.state = self.HALF_OPEN
+        self.probing = True
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def abandon(self):
+        """The request was cancelled before it had an outcome, free the probe slot"""
+        self.probing = False
+
+    def record_failure(self, now=None):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.threshold):
+            if self.state == self.CLOSED:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic() if now is None else now
+            self.probing = False
+
+    def retry_in(self, now=None):
+        """Seconds until the next probe is allowed (0 when closed)"""
+        if self.state == self.CLOSED:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - (time.monotonic() if now is None else now))
+
+
+def parse_retry_after(value):
+    """Retry-After header (delta seconds or HTTP date) in seconds, None if absent/invalid"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    if isinstance(error, LLMRequestError):
+        return error.status in RETRYABLE_STATUS
+    return isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError))
+
+
+def retry_delay(attempt, retry_after=None):
+    """Retry-After if the server sent one, full-jitter exponential backoff otherwise"""
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+async def post_completion(session, endpoint, headers, body, deadline=AI_REQUEST_DEADLINE, max_retries=AI_MAX_RETRIES, on_attempt=None):
+    """POST a chat completion to one endpoint with deadline, retries and its circuit breaker.
+
+    on_attempt() is called right before every request that goes out, e.g. to meter provider quota.
+
+    Returns the decoded response body. Raises CircuitOpenError when the endpoint's circuit rejects the request,
+    LLMRequestError or the transport exception once retries are exhausted.
+    """
+    breaker = endpoint.breaker
+    give_up_at = time.monotonic() + deadline
+    attempt = 0
+    while True:
+        if not breaker.before_request():
+            raise CircuitOpenError(endpoint.model)
+
+        # Pool's connect/read timeouts per socket operation, the deadline for the whole attempt
+        timeout = aiohttp.ClientTimeout(
+            total=give_up_at - time.monotonic(),
+            sock_connect=session.timeout.sock_connect,
+            sock_read=session.timeout.sock_read
+        )
+        if on_attempt:
+            on_attempt()
+        try:
+            async with session.post(endpoint.url, headers=headers, data=body, timeout=timeout) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    breaker.record_success()
+                    return data
+                raise LLMRequestError(response.status, await response.text(), parse_retry_after(response.headers.get('Retry-After')))
+        except asyncio.CancelledError:
+            # Lost a hedged race
+            breaker.abandon()
+            raise
+        except Exception as e:
+            error = e
+
+        if not is_retryable(error):
+            # The upstream answered (e.g. bad request/auth), that's not an outage
+            breaker.record_success()
+            raise error
+        breaker.record_failure()
+
+        delay = retry_delay(attempt, getattr(error, 'retry_after', None))
+        if (breaker.state == breaker.OPEN or attempt >= max_retries or delay > RETRY_MAX_DELAY
+                or time.monotonic() + delay >= give_up_at):
+            raise error
+        attempt += 1
+        endpoint.retries += 1
+        logging.info(f"Retrying LLM request to {endpoint.model} in {delay:.1f}s ({error})")
+        await asyncio.sleep(delay)
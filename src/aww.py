@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-import aiohttp
 import random
 import asyncio
 import io
@@ -55,33 +54,34 @@ class AwwCog(commands.Cog):
         self.last_used[ctx.author.id] = datetime.now()
         
         try:
-            # Get random cat from cataas.com
-            async with aiohttp.ClientSession() as session:
-                # Only use image endpoints (no GIFs to avoid embedding issues)
-                endpoints = [
-                    "https://cataas.com/cat",
-                    "https://cataas.com/cat/cute",
-                    "https://cataas.com/cat/kitten"
-                ]
-                
-                selected_endpoint = random.choice(endpoints)
-                
-                async with session.get(selected_endpoint) as response:
-                    if response.status == 200:
-                        # Get the image data
-                        image_data = await response.read()
-                        
-                        # Get random cat ASCII
-                        random_cat = random.choice(self.cat_ascii)
-                        
-                        # Create a file object and send it directly
-                        file = discord.File(io.BytesIO(image_data), filename="cat.jpg")
-                        await ctx.send(f"{random_cat} Here's your random cat!", file=file)
-                    else:
-                        # Fallback message
-                        random_cat = random.choice(self.cat_ascii)
-                        await ctx.send(f"Oops! The cat delivery service is having issues right now {random_cat} Try again later!")
-                        
+            # Get random cat from cataas.com (shared pooled session owned by the bot)
+            session = self.bot.http_clients.get("cataas")
+
+            # Only use image endpoints (no GIFs to avoid embedding issues)
+            endpoints = [
+                "https://cataas.com/cat",
+                "https://cataas.com/cat/cute",
+                "https://cataas.com/cat/kitten"
+            ]
+            
+            selected_endpoint = random.choice(endpoints)
+            
+            async with session.get(selected_endpoint) as response:
+                if response.status == 200:
+                    # Get the image data
+                    image_data = await response.read()
+                    
+                    # Get random cat ASCII
+                    random_cat = random.choice(self.cat_ascii)
+                    
+                    # Create a file object and send it directly
+                    file = discord.File(io.BytesIO(image_data), filename="cat.jpg")
+                    await ctx.send(f"{random_cat} Here's your random cat!", file=file)
+                else:
+                    # Fallback message
+                    random_cat = random.choice(self.cat_ascii)
+                    await ctx.send(f"Oops! The cat delivery service is having issues right now {random_cat} Try again later!")
+                    
         except Exception as e:
             # Error fallback
             random_cat = random.choice(self.cat_ascii)
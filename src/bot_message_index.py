@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import collections
+
+import discord
+
+BOT_MESSAGE_INDEX_SIZE = 5000  # Most recent bot message IDs kept for reply detection
+
+
+class BotMessageIndex:
+    """Bounded set of message IDs the bot itself has sent.
+
+    Snowflakes are time-ordered, so for any ID newer than `coverage_start` the
+    index is authoritative: not in the set means not sent by the bot, no REST
+    call needed. Only older references need a fallback lookup.
+    """
+
+    def __init__(self, maxlen=BOT_MESSAGE_INDEX_SIZE):
+        self.maxlen = maxlen
+        self.order = collections.deque()
+        self.ids = set()
+        # Everything from now on is seen by on_message
+        self.coverage_start = discord.utils.time_snowflake(discord.utils.utcnow())
+
+        # How reply lookups were resolved
+        self.lookups = collections.Counter()
+
+    def add(self, message_id):
+        if message_id in self.ids:
+            return
+        self.order.append(message_id)
+        self.ids.add(message_id)
+        if len(self.order) > self.maxlen:
+            evicted = self.order.popleft()
+            self.ids.discard(evicted)
+            self.coverage_start = max(self.coverage_start, evicted + 1)
+
+    def lookup(self, message_id):
+        """True/False if the index knows the answer, None if the ID predates its coverage"""
+        if message_id in self.ids:
+            return True
+        if message_id >= self.coverage_start:
+            return False
+        return None
+
+    def record(self, source):
+        self.lookups[source] += 1
+
+    def rest_hit_rate(self):
+        """Share of reply lookups that needed a REST fetch"""
+        total = sum(self.lookups.values())
+        return self.lookups["rest"] / total if total else 0.0
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import asyncio
+import collections
+import os
+import re
+import time
+
+import discord
+
+COUNTING_FAST_RATE = float(os.getenv('COUNTING_FAST_RATE', 30))  # Counts/minute above which reactions stop
+COUNTING_STATUS_INTERVAL = float(os.getenv('COUNTING_STATUS_INTERVAL', 5))  # Seconds between status message edits
+RATE_WINDOW = 20  # Seconds the counting rate is measured over
+SLOW_RATE_FACTOR = 0.5  # Back to reactions below this share of the fast rate, so the mode doesn't flap
+
+# "✅ Verified up to **42** by <@123> · https://discord.com/channels/guild/channel/message"
+STATUS_PATTERN = re.compile(r"^✅ Verified up to \*\*(\d+)\*\* by <@(\d+)> · https://discord\.com/channels/\d+/\d+/(\d+)$")
+
+
+def parse_status(content):
+    """(count, user_id, message_id) from a status message, None if it isn't one"""
+    match = STATUS_PATTERN.match(content)
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2)), int(match.group(3))
+
+
+class AckStrategy:
+    """Acknowledges valid counts with ✅ reactions, or a status message when counting is fast.
+
+    Reactions are rate limited per channel, so at high counting speed they
+    queue up. Above COUNTING_FAST_RATE counts/minute a single "verified up to
+    N" message is posted and edited at most every COUNTING_STATUS_INTERVAL
+    seconds instead; it names the last count's message so the history scan
+    can recover the count from it like from a ✅.
+    """
+
+    def __init__(self, ledger, fast_rate=COUNTING_FAST_RATE):
+        self.ledger = ledger  # Its state is what the status message shows
+        self.fast_rate = fast_rate
+        self.fast = False
+        self.recent = collections.deque()  # monotonic times of recent counts
+        self.channel = None
+        self.guild_id = None
+        self.status_message = None
+        self.status_task = None
+        self.status_dirty = False
+        self.tasks = set()
+
+        self.reactions = 0
+        self.status_edits = 0
+        self.switches = 0
+
+    def rate(self, now=None):
+        """Counts per minute over the last RATE_WINDOW seconds"""
+        now = time.monotonic() if now is None else now
+        while self.recent and self.recent[0] <= now - RATE_WINDOW:
+            self.recent.popleft()
+        return len(self.recent) * 60 / RATE_WINDOW
+
+    def acknowledge(self, message):
+        """Acknowledge a committed count without waiting for Discord"""
+        self.channel = message.channel
+        self.guild_id = message.guild.id
+        self.recent.append(time.monotonic())
+        rate = self.rate()
+        if not self.fast and rate > self.fast_rate:
+            self.fast = True
+            self.switches += 1
+            print(f"⚡ Counting at {rate:.0f}/min, acknowledging with a status message")
+        elif self.fast and rate < self.fast_rate * SLOW_RATE_FACTOR:
+            self.fast = False
+            self.switches += 1
+            print(f"🐢 Counting at {rate:.0f}/min, back to reactions")
+            self.refresh()  # Final edit so the status covers everything before this count
+
+        if self.fast:
+            self.refresh()
+        else:
+            self._spawn(self._react(message))
+
+    def refresh(self):
+        """Bring the status message up to date (coalesced), if there is one or counting is fast"""
+        if self.status_message is None and not self.fast:
+            return
+        if self.status_task and not self.status_task.done():
+            self.status_dirty = True
+            return
+        self.status_task = self._spawn(self._update_status())
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def _react(self, message):
+        self.reactions += 1
+        try:
+            await message.add_reaction('✅')
+        except Exception as e:
+            print(f"❌ Error adding reaction: {e}")
+
+    def status_text(self):
+        state = self.ledger.state
+        return f"✅ Verified up to **{state.count}** by <@{state.user_id or 0}> · https://discord.com/channels/{self.guild_id}/{self.channel.id}/{state.message_id or 0}"
+
+    async def _update_status(self):
+        while True:
+            self.status_dirty = False
+            self.status_edits += 1
+            try:
+                if self.status_message is None:
+                    self.status_message = await self.channel.send(self.status_text(), allowed_mentions=discord.AllowedMentions.none())
+                else:
+                    await self.status_message.edit(content=self.status_text(), allowed_mentions=discord.AllowedMentions.none())
+            except discord.NotFound:
+                self.status_message = None  # Deleted by someone, post a new one next time
+                self.status_dirty = True
+            except Exception as e:
+                print(f"❌ Error updating counting status message: {e}")
+            await asyncio.sleep(COUNTING_STATUS_INTERVAL)
+            if not self.status_dirty:
+                break
+        if not self.fast:
+            # Episode over, the next fast phase posts a fresh status message at the bottom
+            self.status_message = None
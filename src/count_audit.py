@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""Re-validate a whole counting channel offline from an exported history.
+
+Reads DiscordChatExporter exports (JSON or CSV), streams every message
+through the counting rules and reports where the channel diverges from
+them: invalid messages that survived, counts the bot accepted although the
+rules reject them, and valid counts that were never acknowledged.
+
+Usage: python count_audit.py export.(json|csv) [--start N] [--examples N] [--bot-id ID]
+"""
+
+# Imports
+import argparse
+import array
+import bisect
+import csv
+import json
+import sys
+import time
+
+from count_acks import parse_status
+from count_rules import CountEngine, VALID, NOT_A_NUMBER, SAME_USER, WRONG_NUMBER
+
+VERDICT_NAMES = {NOT_A_NUMBER: "not a number", SAME_USER: "same user twice", WRONG_NUMBER: "wrong number"}
+READ_CHUNK = 1 << 20  # Characters read from the export at a time
+
+
+def iter_json_array(f, key):
+    """Stream the objects of the top-level array `key` one by one, without loading the whole file"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+
+    def fill():
+        nonlocal buffer, eof
+        chunk = f.read(READ_CHUNK)
+        eof = not chunk
+        buffer += chunk
+
+    # Find the start of the array
+    marker = f'"{key}"'
+    while True:
+        start = buffer.find(marker)
+        if start != -1:
+            bracket = buffer.find('[', start + len(marker))
+            if bracket != -1:
+                position = bracket + 1
+                break
+        if eof:
+            raise ValueError(f"no \"{key}\" array in the export")
+        fill()
+
+    while True:
+        # Skip separators
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            buffer, position = "", 0
+            fill()
+        if position >= len(buffer) or buffer[position] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Object continues in the next chunk
+            buffer = buffer[position:]
+            position = 0
+            fill()
+            continue
+        yield item
+        position = end
+
+
+def read_json(path, bot_ids=()):
+    """(message_id, user_id, is_bot, content, acknowledged) from a DiscordChatExporter JSON export, streamed"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for message in iter_json_array(f, "messages"):
+            author = message["author"]
+            user_id = int(author["id"])
+            acknowledged = any(reaction["emoji"]["name"] == '✅' for reaction in message.get("reactions") or ())
+            yield int(message["id"]), user_id, author.get("isBot", False) or user_id in bot_ids, message["content"], acknowledged
+
+
+def read_csv(path, bot_ids=()):
+    """Same rows from a DiscordChatExporter CSV export, which has no message IDs (row numbers stand in)
+    and no bot flag: rows by `bot_ids` are the bot's"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        author_column = header.index("AuthorID")
+        content_column = header.index("Content")
+        reactions_column = header.index("Reactions") if "Reactions" in header else None
+        for row_number, row in enumerate(reader, 1):
+            user_id = int(row[author_column])
+            acknowledged = reactions_column is not None and '✅' in row[reactions_column]
+            yield row_number, user_id, user_id in bot_ids, row[content_column], acknowledged
+
+
+def merge_ranges(ranges):
+    """Sorted, non-overlapping (start, end) ranges and their starts, for bisect lookups"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged, [start for start, _ in merged]
+
+
+class AuditReport:
+    def __init__(self, examples):
+        self.examples = examples
+        self.messages = 0
+        self.bot_messages = 0
+        self.valid = 0
+        self.divergences = {"invalid_kept": 0, "accepted_invalid": 0, "unacknowledged": 0}
+        self.samples = []
+
+    def add(self, kind, message_id, detail):
+        self.divergences[kind] += 1
+        if len(self.samples) < self.examples:
+            self.samples.append((kind, message_id, detail))
+
+
+def audit(rows, engine, report):
+    """Replay messages oldest first through the engine and collect divergences"""
+    unacknowledged = array.array('Q')  # Valid counts without ✅, unless a status message covers them
+    unacknowledged_numbers = array.array('q')
+    status_ranges = []  # (first, last) count number a status message acknowledged
+    acknowledged_count = engine.count  # Newest count with a ✅
+    feed = engine.feed
+
+    for message_id, user_id, is_bot, content, acknowledged in rows:
+        report.messages += 1
+        if is_bot:
+            report.bot_messages += 1
+            status = parse_status(content)
+            if status:
+                # Posted after the count that switched to fast mode (and any that came in while it was
+                # being sent), so it also covers the unacknowledged counts right before it
+                status_ranges.append((min(acknowledged_count + 1, engine.count), status[0]))
+            continue
+
+        expected = engine.count + 1
+        verdict, number = feed(content, user_id, message_id)
+        if verdict == VALID:
+            report.valid += 1
+            if acknowledged:
+                acknowledged_count = number
+            else:
+                unacknowledged.append(message_id)
+                unacknowledged_numbers.append(number)
+        elif acknowledged:
+            # The bot counted it: trust the channel and continue from there instead of cascading
+            report.add("accepted_invalid", message_id, f"{number} accepted, rules expected {expected} ({VERDICT_NAMES[verdict]})")
+            engine.commit(number, user_id, message_id)
+            acknowledged_count = number
+        else:
+            report.add("invalid_kept", message_id, f"{content[:30]!r} kept, expected {expected} ({VERDICT_NAMES[verdict]})")
+
+    ranges, starts = merge_ranges(status_ranges)
+    for message_id, number in zip(unacknowledged, unacknowledged_numbers):
+        index = bisect.bisect_right(starts, number) - 1
+        if index < 0 or number > ranges[index][1]:
+            report.add("unacknowledged", message_id, f"valid count {number} has no ✅")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('export', help="DiscordChatExporter export of the counting channel (.json or .csv)")
+    parser.add_argument('--start', type=int, default=0, help="count before the first exported message")
+    parser.add_argument('--examples', type=int, default=20, help="divergences to list")
+    parser.add_argument('--bot-id', type=int, action='append', default=[], help="user ID of the bot (repeatable), needed for CSV exports")
+    args = parser.parse_args()
+
+    bot_ids = set(args.bot_id)
+    rows = read_csv(args.export, bot_ids) if args.export.endswith('.csv') else read_json(args.export, bot_ids)
+    engine = CountEngine(args.start)
+    report = AuditReport(args.examples)
+
+    started = time.perf_counter()
+    audit(rows, engine, report)
+    elapsed = time.perf_counter() - started
+
+    print(f"messages: {report.messages:,} ({report.bot_messages:,} from bots), valid counts: {report.valid:,}")
+    print(f"final count: {engine.count} (next {engine.expected}), last message: {engine.message_id}")
+    print(f"audit took {elapsed:.2f}s ({report.messages / elapsed if elapsed else 0:,.0f} messages/s incl. parsing)")
+    for kind, count in report.divergences.items():
+        print(f"{kind}: {count:,}")
+    for kind, message_id, detail in report.samples:
+        print(f"  [{kind}] message {message_id}: {detail}")
+    sys.exit(1 if any(report.divergences.values()) else 0)
+
+
+if __name__ == '__main__':
+    main()
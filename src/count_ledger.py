@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import collections
+import json
+import logging
+import os
+import struct
+import time
+
+COUNTING_DATA_DIR = os.getenv('COUNTING_DATA_DIR', os.path.join('data', 'counting'))
+CHECKPOINT_EVERY = 100  # Ledger records between checkpoint rewrites
+RECENT_COUNTS_SIZE = 1000  # Newest counts kept in memory for delete/edit handling
+
+# number, user_id, message_id, epoch seconds, kind (32 bytes)
+RECORD = struct.Struct('<qQQIB3x')
+KIND_COUNT = 0  # A validated count
+KIND_REVERT = 1  # The last count was deleted, state rolled back to this record
+KIND_RESET = 2  # Admin reset
+KIND_SEED = 3  # State found by the legacy history scan (no ledger yet)
+
+
+class CountState:
+    """Counting position after a ledger record"""
+
+    __slots__ = ('count', 'user_id', 'message_id', 'timestamp')
+
+    def __init__(self, count=0, user_id=None, message_id=None, timestamp=0):
+        self.count = count
+        self.user_id = user_id
+        self.message_id = message_id  # Last counting message, catch-up starts after it
+        self.timestamp = timestamp
+
+
+class RecentCounts:
+    """Bounded window of the newest validated counts, keyed by message ID.
+
+    Lets raw delete/edit events (which often carry no cached message) find
+    out in O(1) whether a message was a count, which number it was and what
+    the count before it was, without fetching channel history.
+    """
+
+    def __init__(self, maxlen=RECENT_COUNTS_SIZE):
+        self.maxlen = maxlen
+        self.states = collections.OrderedDict()  # message_id -> CountState, oldest first
+
+    def __len__(self):
+        return len(self.states)
+
+    def add(self, state):
+        if not state.message_id:
+            return
+        self.states[state.message_id] = state
+        self.states.move_to_end(state.message_id)
+        if len(self.states) > self.maxlen:
+            self.states.popitem(last=False)
+
+    def get(self, message_id):
+        return self.states.get(message_id)
+
+    def discard(self, message_id):
+        self.states.pop(message_id, None)
+
+    def last(self):
+        """Newest count in the window, None if it's empty"""
+        if not self.states:
+            return None
+        return next(reversed(self.states.values()))
+
+    def clear(self):
+        self.states.clear()
+
+
+class CountLedger:
+    """Durable, append-only log of counting state changes plus a checkpoint.
+
+    Every validated count is one fixed-size record written straight to the
+    ledger file. The checkpoint (atomically replaced JSON) holds the state
+    and the ledger length it covers, so startup reads it and replays at most
+    CHECKPOINT_EVERY records instead of scanning the channel.
+    """
+
+    def __init__(self, directory=COUNTING_DATA_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.ledger_path = os.path.join(directory, 'ledger.bin')
+        self.checkpoint_path = os.path.join(directory, 'checkpoint.json')
+        self.fd = os.open(self.ledger_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        self.state = CountState()
+        self.records = 0
+        self.checkpointed = 0
+        self.last_kind = None  # Kind of the newest record, None while the ledger is empty
+        self.load()
+
+    @property
+    def empty(self):
+        return self.records == 0
+
+    def load(self):
+        """Checkpoint, then replay the ledger records written after it"""
+        size = os.fstat(self.fd).st_size
+        if size % RECORD.size:
+            # Torn final record from a crash mid-write
+            logging.warning(f"Counting ledger: dropping {size % RECORD.size} trailing bytes")
+            size -= size % RECORD.size
+            os.truncate(self.ledger_path, size)
+        self.records = size // RECORD.size
+
+        try:
+            if os.path.exists(self.checkpoint_path):
+                with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                if saved.get("records", 0) <= self.records:
+                    self.state = CountState(saved["count"], saved["user_id"], saved["message_id"], saved.get("timestamp", 0))
+                    self.checkpointed = saved.get("records", 0)
+        except Exception as e:
+            print(f"❌ Error loading counting checkpoint, replaying the ledger: {e}")
+            self.state = CountState()
+            self.checkpointed = 0
+
+        for index in range(self.checkpointed, self.records):
+            self.state = self._state(self.read(index))
+        if self.records:
+            self.last_kind = self.read(self.records - 1)[4]
+
+    @staticmethod
+    def _state(record):
+        number, user_id, message_id, timestamp, _ = record
+        return CountState(number, user_id or None, message_id or None, timestamp)
+
+    def read(self, index):
+        return RECORD.unpack(os.pread(self.fd, RECORD.size, index * RECORD.size))
+
+    def append(self, number, user_id, message_id, kind=KIND_COUNT, timestamp=None):
+        """Write one record and make it the current state (page cache, no fsync)"""
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        os.write(self.fd, RECORD.pack(number, user_id or 0, message_id or 0, timestamp, kind))
+        self.records += 1
+        self.last_kind = kind
+        self.state = CountState(number, user_id, message_id, timestamp)
+        if self.records - self.checkpointed >= CHECKPOINT_EVERY:
+            self.checkpoint()
+        return self.state
+
+    def recent_states(self, limit=RECENT_COUNTS_SIZE):
+        """Counts still standing among the last records, oldest first, for filling RecentCounts"""
+        first = max(0, self.records - 2 * limit)  # Room for reverts among them
+        data = os.pread(self.fd, (self.records - first) * RECORD.size, first * RECORD.size)
+        states = []
+        for record in RECORD.iter_unpack(data):
+            kind = record[4]
+            if kind == KIND_RESET:
+                states.clear()
+            elif kind == KIND_REVERT:
+                while states and states[-1].count > record[0]:
+                    states.pop()
+            else:
+                states.append(self._state(record))
+        return states[-limit:]
+
+    def previous_count(self, number):
+        """(state, kind) of the newest record for `number`, searched backwards from the end, None if there is none.
+
+        A reset starts the current sequence, so it's the previous state of the first count after it.
+        """
+        for index in range(self.records - 1, -1, -1):
+            record = self.read(index)
+            if record[0] == number and record[4] in (KIND_COUNT, KIND_SEED):
+                return self._state(record), KIND_REVERT
+            if record[4] == KIND_RESET:
+                # Counts before a reset don't belong to this sequence
+                return (self._state(record), KIND_RESET) if record[0] == number else None
+        return None
+
+    def revert(self, message_id, previous=None):
+        """Roll back the count of a deleted message, None if the ledger can't tell the previous state"""
+        if message_id != self.state.message_id or self.state.count <= 0:
+            return None
+        kind = KIND_REVERT
+        if previous is None:
+            found = self.previous_count(self.state.count - 1)
+            if found is not None:
+                # Back to a reset stays a reset, so its kept message position isn't rolled back later
+                previous, kind = found
+        if previous is None:
+            if self.state.count - 1 != 0:
+                return None
+            previous = CountState()
+        return self.append(previous.count, previous.user_id, previous.message_id, kind, previous.timestamp)
+
+    def checkpoint(self):
+        """Atomically persist the current state and the ledger length it covers"""
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "count": self.state.count,
+                "user_id": self.state.user_id,
+                "message_id": self.state.message_id,
+                "timestamp": self.state.timestamp,
+                "records": self.records
+            }, f)
+        os.replace(tmp_path, self.checkpoint_path)
+        self.checkpointed = self.records
+
+    def close(self):
+        if self.records != self.checkpointed:
+            self.checkpoint()
+        os.close(self.fd)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import asyncio
+import os
+
+import discord
+
+COUNTING_REJECT_WINDOW = float(os.getenv('COUNTING_REJECT_WINDOW', 1.0))  # Seconds invalid messages are collected
+BULK_DELETE_MAX = 100  # Discord's bulk delete limit per call
+NOTICE_TTL = 10  # Seconds the merged notice stays up
+NOTICE_MAX_LINES = 15
+
+
+class RejectBatcher:
+    """Removes invalid counting messages in bulk and explains them in one notice.
+
+    Rejections are collected for COUNTING_REJECT_WINDOW seconds, then deleted
+    with a single bulk delete and listed in one auto-expiring embed: about
+    three API calls per batch instead of three per invalid message, so a spam
+    wave doesn't drain the channel's rate limit bucket for the valid counts.
+    """
+
+    def __init__(self, window=COUNTING_REJECT_WINDOW):
+        self.window = window
+        self.pending = []  # (message, title, description)
+        self.task = None
+
+        self.invalid = 0
+        self.batches = 0
+        self.api_calls = 0
+
+    def add(self, message, title, description):
+        self.pending.append((message, title, description))
+        self.invalid += 1
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        # Whatever came in while a batch was being flushed goes out right after it
+        while self.pending:
+            batch, self.pending = self.pending[:BULK_DELETE_MAX], self.pending[BULK_DELETE_MAX:]
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                print(f"❌ Error flushing invalid counting messages: {e}")
+
+    async def _flush(self, batch):
+        channel = batch[0][0].channel
+        self.batches += 1
+        results = await asyncio.gather(
+            self._delete(channel, [message for message, _, _ in batch]),
+            self._notify(channel, batch),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"❌ Error deleting messages or sending error notice: {result}")
+        print(f"🗑️ Deleted {len(batch)} invalid counting message(s) in one batch")
+
+    async def _delete(self, channel, messages):
+        self.api_calls += 1
+        try:
+            await channel.delete_messages(messages)
+        except discord.HTTPException:
+            # Bulk delete refuses messages older than 14 days: fall back to single deletes
+            self.api_calls += len(messages)
+            await asyncio.gather(*(message.delete() for message in messages), return_exceptions=True)
+
+    async def _notify(self, channel, batch):
+        mentions = []
+        lines = []
+        for message, title, description in batch:
+            if message.author.mention not in mentions:
+                mentions.append(message.author.mention)
+            lines.append(f"{message.author.mention} **{title}** {description}")
+        if len(lines) > NOTICE_MAX_LINES:
+            lines = lines[:NOTICE_MAX_LINES] + [f"…and {len(lines) - NOTICE_MAX_LINES} more"]
+
+        embed = discord.Embed(
+            title="❌ Invalid Message" if len(batch) == 1 else f"❌ {len(batch)} Invalid Messages",
+            description="\n".join(lines)[:4096],
+            color=0xff0000
+        )
+        # Send plus the delayed delete of delete_after
+        self.api_calls += 2
+        await channel.send(" ".join(mentions)[:2000], embed=embed, delete_after=NOTICE_TTL)
+
+    def calls_per_invalid(self):
+        return self.api_calls / self.invalid if self.invalid else 0.0
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import re
+
+NUMBER_PATTERN = re.compile(r'\s*(\d+)')
+
+# Verdicts
+VALID = 0
+NOT_A_NUMBER = 1
+SAME_USER = 2
+WRONG_NUMBER = 3
+
+
+def extract_number(content):
+    """The number a message starts with, None if it doesn't start with one"""
+    if content.isdecimal():
+        return int(content)  # Fast path: the message is just the number
+    match = NUMBER_PATTERN.match(content)
+    if match:
+        return int(match.group(1))
+    return None
+
+
+class CountEngine:
+    """The counting rules as a pure state machine, no Discord I/O.
+
+    A message is a valid count if it starts with the next number and its
+    author didn't post the previous count. Used by the cog for live messages
+    and the startup catch-up, and by count_audit for offline replays.
+    """
+
+    def __init__(self, count=0, user_id=None, message_id=None):
+        self.count = count
+        self.user_id = user_id
+        self.message_id = message_id
+
+    @property
+    def expected(self):
+        return self.count + 1
+
+    def judge(self, content, user_id):
+        """(verdict, number) for a message, without changing the state"""
+        number = extract_number(content)
+        if number is None:
+            return NOT_A_NUMBER, None
+        if number != self.count + 1:
+            return WRONG_NUMBER, number
+        if user_id == self.user_id:
+            return SAME_USER, number
+        return VALID, number
+
+    def commit(self, number, user_id, message_id):
+        self.count = number
+        self.user_id = user_id
+        self.message_id = message_id
+
+    def feed(self, content, user_id, message_id):
+        """Judge a message and commit it if it's a valid count (judge inlined, this is the audit hot loop)"""
+        number = int(content) if content.isdecimal() else extract_number(content)
+        if number is None:
+            return NOT_A_NUMBER, None
+        if number != self.count + 1:
+            return WRONG_NUMBER, number
+        if user_id == self.user_id:
+            return SAME_USER, number
+        self.count = number
+        self.user_id = user_id
+        self.message_id = message_id
+        return VALID, number
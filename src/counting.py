@@ -1,26 +1,89 @@
 import discord
 from discord.ext import commands
 import os
-import re
 import asyncio
 from datetime import datetime
 
+from count_ledger import CountLedger, RecentCounts, KIND_COUNT, KIND_RESET, KIND_SEED
+from count_rejects import RejectBatcher
+from count_acks import AckStrategy, parse_status
+from count_rules import CountEngine, extract_number, VALID, NOT_A_NUMBER, SAME_USER
+
 class CountingCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.fckr_server_id = int(os.getenv('FCKR_SERVER', 0))
         self.counting_channel_id = int(os.getenv('COUNTING_CHANNEL_ID', 0))
-        self.current_count = 0
-        self.last_user_id = None
-        self.last_message_id = None  # Add this line
+        # Durable count history, restores the position without reading the channel
+        self.ledger = CountLedger()
+        # The counting rules and current position, no I/O
+        self.engine = CountEngine(self.ledger.state.count, self.ledger.state.user_id, self.ledger.state.message_id)
+        # Newest counts by message ID, so raw delete/edit events need no history fetch
+        self.recent = RecentCounts()
+        for state in self.ledger.recent_states(self.recent.maxlen):
+            self.recent.add(state)
+        self.edit_notices = set()  # Edited counts already announced
         self.initialized = False
-        
+
+        # Validation pipeline: one consumer, side effects fan out as tasks
+        self.pending = asyncio.Queue()
+        self.validator = None
+        self.history_lock = asyncio.Lock()  # Held by the validator per message and by history rescans
+        self.acks = AckStrategy(self.ledger)  # ✅ reactions, or a status message when counting is fast
+        self.rejects = RejectBatcher()  # Invalid messages are deleted and explained in bulk
+        self.voice_stats_task = None
+        self.voice_stats_dirty = False
+
+    @property
+    def current_count(self):
+        return self.engine.count
+
+    @current_count.setter
+    def current_count(self, value):
+        self.engine.count = value
+
+    @property
+    def last_user_id(self):
+        return self.engine.user_id
+
+    @last_user_id.setter
+    def last_user_id(self, value):
+        self.engine.user_id = value
+
+    @property
+    def last_message_id(self):
+        return self.engine.message_id
+
+    @last_message_id.setter
+    def last_message_id(self, value):
+        self.engine.message_id = value
+
+    def cog_unload(self):
+        if self.validator:
+            self.validator.cancel()
+        self.ledger.close()
+
+    def commit_count(self, number, user_id, message_id, kind=KIND_COUNT, timestamp=None):
+        """Make a count the current state, ledger first"""
+        state = self.ledger.append(number, user_id, message_id, kind, timestamp)
+        self.engine.commit(number, user_id, message_id)
+        if kind == KIND_RESET:
+            self.recent.clear()
+        elif kind in (KIND_COUNT, KIND_SEED):
+            self.recent.add(state)
+
     @commands.Cog.listener()
     async def on_ready(self):
         """Initialize counting system when bot is ready"""
         if not self.initialized:
-            await self.initialize_counting()
-            self.initialized = True
+            try:
+                await self.initialize_counting()
+            except Exception as e:
+                print(f"❌ Error initializing counting, continuing from the ledger state: {e}")
+            finally:
+                self.initialized = True
+                # Messages that arrived during the catch-up waited in the queue
+                self.validator = asyncio.create_task(self.run_validator())
     
     async def initialize_counting(self):
         """Read the last valid number from the counting channel"""
@@ -35,13 +98,59 @@ class CountingCog(commands.Cog):
             return
         
         print(f"🔢 Initializing counting system in {counting_channel.name}")
-        
+
+        if not self.ledger.empty:
+            await self.catch_up(counting_channel)
+        else:
+            # First start with a ledger: seed it once from the recent history
+            await self.seed_from_history(counting_channel)
+
+    async def seed_from_history(self, counting_channel):
+        """Recover the count from the recent history and record it in the ledger"""
+        await self.scan_recent_history(counting_channel)
+        self.commit_count(self.current_count, self.last_user_id, self.last_message_id, KIND_SEED)
+
+    async def catch_up(self, counting_channel):
+        """Validate only what was posted after the last ledger record (i.e. during downtime)"""
+        if not self.last_message_id:
+            # No message to start after (seeded from an empty scan, or reverted to 0):
+            # replaying from the channel's first message could take hours
+            print(f"🔢 Ledger checkpoint has no message position, scanning the recent history instead")
+            await self.seed_from_history(counting_channel)
+            return
+        print(f"🔢 Ledger checkpoint: count {self.current_count}, catching up after message {self.last_message_id}")
+        after = discord.Object(id=self.last_message_id)
+        counted = skipped = 0
+        try:
+            async for message in counting_channel.history(limit=None, after=after, oldest_first=True):
+                if message.author.bot:
+                    continue
+                verdict, number = self.engine.judge(message.content, message.author.id)
+                if verdict == VALID:
+                    self.commit_count(number, message.author.id, message.id, timestamp=message.created_at.timestamp())
+                    counted += 1
+                    if not any(reaction.emoji == '✅' and reaction.me for reaction in message.reactions):
+                        # A long backlog counts as fast counting: one status message instead of a reaction each
+                        self.acks.acknowledge(message)
+                else:
+                    # Nobody got feedback while we were down, so leave these alone instead of deleting them
+                    skipped += 1
+            print(f"✅ Caught up: {counted} counts, {skipped} messages skipped, current count: {self.current_count}")
+        except Exception as e:
+            print(f"❌ Error catching up counting history: {e}")
+
+    async def scan_recent_history(self, counting_channel):
+        """Legacy recovery: find the last ✅ count (or status message) in the last 200 messages"""
         # Read the last 200 messages to find the highest valid count
         valid_messages = []
         try:
             async for message in counting_channel.history(limit=200, oldest_first=False):
-                # Skip bot messages
+                # Skip bot messages, except our "verified up to N" status messages
                 if message.author.bot:
+                    status = parse_status(message.content) if message.author == self.bot.user else None
+                    if status:
+                        number, user_id, msg_id = status
+                        valid_messages.append((number, user_id or None, discord.utils.snowflake_time(msg_id), msg_id))
                     continue
                 
                 # Check if message has green checkmark (valid count)
@@ -49,7 +158,7 @@ class CountingCog(commands.Cog):
                 
                 if has_checkmark:
                     # Extract number from message
-                    number = self.extract_number(message.content)
+                    number = extract_number(message.content)
                     if number is not None:
                         valid_messages.append((number, message.author.id, message.created_at, message.id))
             
@@ -59,8 +168,8 @@ class CountingCog(commands.Cog):
             # Find the most recent valid count
             if valid_messages:
                 # Take the most recent valid message (first in sorted list)
-                self.current_count, self.last_user_id, _, message_id = valid_messages[0]
-                print(f"✅ Found last valid count: {self.current_count} by user ID {self.last_user_id} (message ID: {message_id})")
+                self.current_count, self.last_user_id, _, self.last_message_id = valid_messages[0]
+                print(f"✅ Found last valid count: {self.current_count} by user ID {self.last_user_id} (message ID: {self.last_message_id})")
                 
                 # Verify this is actually the correct sequence by checking if it's the highest number
                 # in a valid sequence
@@ -71,6 +180,7 @@ class CountingCog(commands.Cog):
                         if number > self.current_count:
                             self.current_count = number
                             self.last_user_id = user_id
+                            self.last_message_id = msg_id
                 
                 print(f"✅ Verified count sequence, current count: {self.current_count}")
                 return
@@ -78,222 +188,200 @@ class CountingCog(commands.Cog):
             # If no valid count found, start from 0
             self.current_count = 0
             self.last_user_id = None
+            self.last_message_id = None
             print(f"🔢 No valid count found, starting from 0")
             
         except Exception as e:
             print(f"❌ Error initializing counting: {e}")
             self.current_count = 0
             self.last_user_id = None
-    
-    def extract_number(self, content):
-        """Extract the first number from a message"""
-        # Look for numbers at the start of the message
-        match = re.match(r'^(\d+)', content.strip())
-        if match:
-            return int(match.group(1))
-        return None
+            self.last_message_id = None
     
     @commands.Cog.listener()
     async def on_message(self, message):
-        """Handle counting messages"""
+        """Queue counting messages for the validator"""
         # Skip if not in counting channel or from bot
         if (message.channel.id != self.counting_channel_id or 
             message.author.bot or 
             message.guild.id != self.fckr_server_id):
             return
-        
-        # Extract number from message
-        number = self.extract_number(message.content)
-        
-        # If no number found, delete message
-        if number is None:
-            try:
-                await message.delete()
-                # Send ephemeral error message
-                error_embed = discord.Embed(
-                    title="❌ Invalid Message",
-                    description=f"Your message '{message.content[:50]}' was deleted because it didn't contain a valid number.",
-                    color=0xff0000
-                )
-                # Try to send as ephemeral reply, fallback to delete_after
-                try:
-                    if hasattr(message, 'reply'):
-                        await message.reply(embed=error_embed, ephemeral=True, delete_after=10)
-                    else:
-                        await message.channel.send(f"{message.author.mention}", embed=error_embed, delete_after=10)
-                except:
-                    await message.channel.send(f"{message.author.mention}", embed=error_embed, delete_after=10)
-                print(f"🗑️ Deleted non-numeric message from {message.author.display_name}: {message.content[:50]}")
-            except Exception as e:
-                print(f"❌ Error deleting message or sending ephemeral message: {e}")
-            return
-        
-        # Check if it's the correct next number
-        expected_number = self.current_count + 1
-        
-        if number == expected_number:
-            # Check if same user posted twice in a row
-            if self.last_user_id == message.author.id:
+
+        self.pending.put_nowait(message)
+
+    async def run_validator(self):
+        """Single consumer of the counting channel: decides and commits in arrival order"""
+        while True:
+            message = await self.pending.get()
+            # Waits only while a rescan after a deletion rewrites the count
+            async with self.history_lock:
                 try:
-                    await message.delete()
-                    # Send ephemeral error message
-                    error_embed = discord.Embed(
-                        title="❌ Same User Twice",
-                        description="You cannot count twice in a row. Wait for someone else to count.",
-                        color=0xff0000
-                    )
-                    # Try to send as ephemeral reply, fallback to delete_after
-                    try:
-                        if hasattr(message, 'reply'):
-                            await message.reply(embed=error_embed, ephemeral=True, delete_after=10)
-                        else:
-                            await message.channel.send(f"{message.author.mention}", embed=error_embed, delete_after=10)
-                    except:
-                        await message.channel.send(f"{message.author.mention}", embed=error_embed, delete_after=10)
-                    print(f"🗑️ Deleted message from {message.author.display_name}: same user can't count twice in a row")
+                    self.validate(message)
                 except Exception as e:
-                    print(f"❌ Error deleting message or sending ephemeral message: {e}")
-                return
-            
-            # Correct number! Add checkmark and update count
-            try:
-                await message.add_reaction('✅')
-                self.current_count = number
-                self.last_user_id = message.author.id
-                self.last_message_id = message.id  # Store the message ID
-                print(f"✅ Valid count {number} by {message.author.display_name}")
-                
-                # Update voice stats immediately after valid count
-                voice_stats_cog = self.bot.get_cog('VoiceStatsCog')
-                if voice_stats_cog:
-                    await voice_stats_cog.update_all_voice_stats()
-                    print(f"🔊 Voice stats updated after count {number}")
-            except Exception as e:
-                print(f"❌ Error adding reaction or updating voice stats: {e}")
-        
+                    print(f"❌ Error validating counting message: {e}")
+
+    def validate(self, message):
+        """Decide and commit synchronously, the Discord calls run afterwards in the background.
+
+        No await between reading and updating the count, so two people posting the
+        same next number can't both pass, and slow REST calls don't hold up the
+        next message.
+        """
+        # Already handled by the startup catch-up
+        if self.last_message_id and message.id <= self.last_message_id:
+            return
+
+        verdict, number = self.engine.judge(message.content, message.author.id)
+
+        # If no number found, delete message
+        if verdict == NOT_A_NUMBER:
+            self.rejects.add(
+                message,
+                "❌ Invalid Message",
+                f"Your message '{message.content[:50]}' was deleted because it didn't contain a valid number."
+            )
+            print(f"🗑️ Deleted non-numeric message from {message.author.display_name}: {message.content[:50]}")
+            return
+
+        # Right number, but same user posted twice in a row
+        if verdict == SAME_USER:
+            self.rejects.add(
+                message,
+                "❌ Same User Twice",
+                "You cannot count twice in a row. Wait for someone else to count."
+            )
+            print(f"🗑️ Deleted message from {message.author.display_name}: same user can't count twice in a row")
+            return
+
+        if verdict == VALID:
+            # Correct number! Commit first, then add the checkmark
+            self.commit_count(number, message.author.id, message.id, timestamp=message.created_at.timestamp())
+            print(f"✅ Valid count {number} by {message.author.display_name}")
+            self.acks.acknowledge(message)
+            self.schedule_voice_stats()
         else:
             # Wrong number, delete message but DON'T reset count
+            self.rejects.add(
+                message,
+                "❌ Wrong Number",
+                f"Your number {number} was wrong. The next number should be {self.engine.expected}."
+            )
+            print(f"🗑️ Deleted wrong number from {message.author.display_name}: {number} (expected {self.engine.expected})")
+
+    def schedule_voice_stats(self):
+        """Refresh the counting voice channel, at most one update in flight plus one queued"""
+        if self.voice_stats_task and not self.voice_stats_task.done():
+            self.voice_stats_dirty = True
+            return
+        self.voice_stats_task = asyncio.create_task(self.update_voice_stats())
+
+    async def update_voice_stats(self):
+        voice_stats_cog = self.bot.get_cog('VoiceStatsCog')
+        if not voice_stats_cog:
+            return
+        while True:
+            self.voice_stats_dirty = False
             try:
-                await message.delete()
-                # Send ephemeral error message
-                error_embed = discord.Embed(
-                    title="❌ Wrong Number",
-                    description=f"Your number {number} was wrong. The next number should be {expected_number}.",
-                    color=0xff0000
-                )
-                # Try to send as ephemeral reply, fallback to delete_after
-                try:
-                    if hasattr(message, 'reply'):
-                        await message.reply(embed=error_embed, ephemeral=True, delete_after=10)
-                    else:
-                        await message.channel.send(f"{message.author.mention}", embed=error_embed, delete_after=10)
-                except:
-                    await message.channel.send(f"{message.author.mention}", embed=error_embed, delete_after=10)
-                print(f"🗑️ Deleted wrong number from {message.author.display_name}: {number} (expected {expected_number})")
-                # DON'T reset count - just continue with the current count
+                await voice_stats_cog.update_all_voice_stats()
+                print(f"🔊 Voice stats updated after count {self.current_count}")
             except Exception as e:
-                print(f"❌ Error deleting message or sending ephemeral message: {e}")
+                print(f"❌ Error updating voice stats: {e}")
+            if not self.voice_stats_dirty:
+                return
 
     @commands.Cog.listener()
-    async def on_message_delete(self, message):
-        """Handle deleted counting messages"""
-        # Skip if not in counting channel or from bot
-        if (message.channel.id != self.counting_channel_id or 
-            message.author.bot or 
-            message.guild.id != self.fckr_server_id):
+    async def on_raw_message_delete(self, payload):
+        """Handle deleted counting messages, cached or not"""
+        if payload.channel_id != self.counting_channel_id or payload.guild_id != self.fckr_server_id:
             return
+        await self.handle_deleted({payload.message_id}, [payload.cached_message] if payload.cached_message else [])
 
-        # Check if the deleted message was the last valid count
-        if message.id == self.last_message_id:
-            # To be safe, re-fetch the last valid count before the deleted one
-            await self.initialize_counting()
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload):
+        """Handle purges in the counting channel (our own bulk deletes only hit invalid messages)"""
+        if payload.channel_id != self.counting_channel_id or payload.guild_id != self.fckr_server_id:
+            return
+        await self.handle_deleted(payload.message_ids, payload.cached_messages)
+
+    async def handle_deleted(self, message_ids, cached_messages):
+        """Roll back when the newest count(s) were deleted, older ones are just history"""
+        for message_id in message_ids:
+            self.recent.discard(message_id)
+            self.edit_notices.discard(message_id)
+
+        # The validator stays paused until the rollback (and a possible rescan) is committed,
+        # so the scan can't overwrite counts made while it was reading the history
+        async with self.history_lock:
+            # Check if the deleted message was the last valid count; after a reset it's only the
+            # position catch-up resumes from, and rolling back would undo the reset
+            if self.last_message_id not in message_ids or self.ledger.last_kind == KIND_RESET:
+                return
 
             deleted_number = self.current_count
-            next_number = self.current_count + 1
-
-            counting_channel = self.bot.get_channel(self.counting_channel_id)
-            if counting_channel:
-                embed = discord.Embed(
-                    title="🔢 Count Interrupted",
-                    description=f"A message by **{message.author.display_name}** with the number **{deleted_number}** was deleted.",
-                    color=0xffa500, # Orange
-                    timestamp=datetime.now()
-                )
-                embed.add_field(name="Last Correct Number", value=str(self.current_count), inline=True)
-                embed.add_field(name="Next Number", value=str(next_number), inline=True)
-                embed.set_footer(text="Please continue counting from the next number.")
-
-                await counting_channel.send(embed=embed)
-                print(f"ℹ️ A deleted message was handled. Last count was {self.current_count}, next is {next_number}.")
+            deleted_message_id = self.last_message_id
+            deleted_user_id = self.last_user_id
+            # Walk back past every deleted trailing count; the window knows the previous
+            # count, only rescan if it predates the ledger
+            while self.last_message_id in message_ids and self.ledger.last_kind != KIND_RESET:
+                previous = self.recent.last()
+                if previous is None or previous.count != self.current_count - 1:
+                    previous = None
+                state = self.ledger.revert(self.last_message_id, previous)
+                if state is None:
+                    counting_channel = self.bot.get_channel(self.counting_channel_id)
+                    if counting_channel:
+                        await self.seed_from_history(counting_channel)
+                    break
+                self.engine.commit(state.count, state.user_id, state.message_id)
+            self.acks.refresh()
+
+        next_number = self.current_count + 1
+        author = next((message.author for message in cached_messages if message.id == deleted_message_id), None)
+        deleted_by = f"**{author.display_name}**" if author else f"<@{deleted_user_id}>"
 
+        counting_channel = self.bot.get_channel(self.counting_channel_id)
+        if counting_channel:
+            embed = discord.Embed(
+                title="🔢 Count Interrupted",
+                description=f"A message by {deleted_by} with the number **{deleted_number}** was deleted.",
+                color=0xffa500, # Orange
+                timestamp=datetime.now()
+            )
+            embed.add_field(name="Last Correct Number", value=str(self.current_count), inline=True)
+            embed.add_field(name="Next Number", value=str(next_number), inline=True)
+            embed.set_footer(text="Please continue counting from the next number.")
+
+            await counting_channel.send(embed=embed)
+            print(f"ℹ️ A deleted message was handled. Last count was {self.current_count}, next is {next_number}.")
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload):
+        """An edit can't change what was counted, but say what the number was"""
+        if payload.channel_id != self.counting_channel_id or payload.guild_id != self.fckr_server_id:
             return
-        
-        # Check if it's the correct next number
-        expected_number = self.current_count + 1
-        
-        if number == expected_number:
-            # Check if same user posted twice in a row
-            if self.last_user_id == message.author.id:
-                try:
-                    await message.delete()
-                    # Send ephemeral error message
-                    error_embed = discord.Embed(
-                        title="❌ Same User Twice",
-                        description="You cannot count twice in a row. Wait for someone else to count.",
-                        color=0xff0000
-                    )
-                    # Try to send as ephemeral reply, fallback to delete_after
-                    try:
-                        if hasattr(message, 'reply'):
-                            await message.reply(embed=error_embed, ephemeral=True, delete_after=10)
-                        else:
-                            await message.channel.send(f"{message.author.mention}", embed=error_embed, delete_after=10)
-                    except:
-                        await message.channel.send(f"{message.author.mention}", embed=error_embed, delete_after=10)
-                    print(f"🗑️ Deleted message from {message.author.display_name}: same user can't count twice in a row")
-                except Exception as e:
-                    print(f"❌ Error deleting message or sending ephemeral message: {e}")
-                return
-            
-            # Correct number! Add checkmark and update count
-            try:
-                await message.add_reaction('✅')
-                self.current_count = number
-                self.last_user_id = message.author.id
-                self.last_message_id = message.id  # Store the message ID
-                print(f"✅ Valid count {number} by {message.author.display_name}")
-                
-                # Update voice stats immediately after valid count
-                voice_stats_cog = self.bot.get_cog('VoiceStatsCog')
-                if voice_stats_cog:
-                    await voice_stats_cog.update_all_voice_stats()
-                    print(f"🔊 Voice stats updated after count {number}")
-            except Exception as e:
-                print(f"❌ Error adding reaction or updating voice stats: {e}")
-        
-        else:
-            # Wrong number, delete message but DON'T reset count
-            try:
-                await message.delete()
-                # Send ephemeral error message
-                error_embed = discord.Embed(
-                    title="❌ Wrong Number",
-                    description=f"Your number {number} was wrong. The next number should be {expected_number}.",
-                    color=0xff0000
-                )
-                # Try to send as ephemeral reply, fallback to delete_after
-                try:
-                    if hasattr(message, 'reply'):
-                        await message.reply(embed=error_embed, ephemeral=True, delete_after=10)
-                    else:
-                        await message.channel.send(f"{message.author.mention}", embed=error_embed, delete_after=10)
-                except:
-                    await message.channel.send(f"{message.author.mention}", embed=error_embed, delete_after=10)
-                print(f"🗑️ Deleted wrong number from {message.author.display_name}: {number} (expected {expected_number})")
-                # DON'T reset count - just continue with the current count
-            except Exception as e:
-                print(f"❌ Error deleting message or sending ephemeral message: {e}")
-    
+        state = self.recent.get(payload.message_id)
+        content = payload.data.get('content')
+        # Not a recent count, or an embed/unfurl update without content
+        if state is None or content is None or extract_number(content) == state.count:
+            return
+        if payload.message_id in self.edit_notices:
+            return
+        self.edit_notices.add(payload.message_id)
+        if len(self.edit_notices) > self.recent.maxlen:
+            self.edit_notices.clear()
+
+        counting_channel = self.bot.get_channel(self.counting_channel_id)
+        if counting_channel:
+            embed = discord.Embed(
+                title="✏️ Count Edited",
+                description=f"<@{state.user_id}> edited their count **{state.count}** into '{content[:50]}'. It still counts.",
+                color=0xffa500,
+                timestamp=datetime.now()
+            )
+            embed.add_field(name="Last Correct Number", value=str(self.current_count), inline=True)
+            embed.add_field(name="Next Number", value=str(self.current_count + 1), inline=True)
+            await counting_channel.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+            print(f"✏️ Count {state.count} was edited into '{content[:50]}'")
+
     @commands.command(name='count')
     async def count_status(self, ctx):
         """Show current counting status (Admin only)"""
@@ -327,6 +415,10 @@ class CountingCog(commands.Cog):
         embed.add_field(name="Last User", value=last_user_name, inline=True)
         embed.add_field(name="Channel", value=f"#{channel_name}", inline=True)
         embed.add_field(name="Initialized", value="✅ Yes" if self.initialized else "❌ No", inline=True)
+        embed.add_field(name="Pipeline", value=f"{self.pending.qsize()} queued, {len(self.acks.tasks)} API calls in flight", inline=True)
+        embed.add_field(name="Acknowledgement", value=f"{'⚡ Status message' if self.acks.fast else '✅ Reactions'} ({self.acks.rate():.0f} counts/min)\n{self.acks.reactions} reactions, {self.acks.status_edits} status edits", inline=True)
+        embed.add_field(name="Invalid Messages", value=f"{self.rejects.invalid} in {self.rejects.batches} batches\n{self.rejects.calls_per_invalid():.2f} API calls each", inline=True)
+        embed.add_field(name="Ledger", value=f"{self.ledger.records} records ({self.ledger.records - self.ledger.checkpointed} since checkpoint)\n{len(self.recent)} recent counts in memory", inline=True)
         
         embed.set_footer(text=f"Requested by {ctx.author.display_name}")
         
@@ -353,8 +445,9 @@ class CountingCog(commands.Cog):
             return
         
         old_count = self.current_count
-        self.current_count = new_count
-        self.last_user_id = None
+        # Keep the message position so catch-up still starts after the last handled message
+        self.commit_count(new_count, None, self.last_message_id, KIND_RESET)
+        self.acks.refresh()
         
         embed = discord.Embed(
             title="🔄 Counting Reset",
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import logging
+
+import aiohttp
+
+# Connection pool profiles per upstream service
+# limit_per_host keeps a burst of mentions from opening hundreds of sockets,
+# keepalive lets follow-up requests skip the TCP + TLS handshake
+HTTP_PROFILES = {
+    "openrouter": {
+        "limit": 32,
+        "limit_per_host": 16,
+        "keepalive_timeout": 60,
+        "ttl_dns_cache": 300,
+        "connect_timeout": 5,
+        "read_timeout": 30
+    },
+    "local_llm": {
+        # CPU-bound inference server on this host: few sockets, slow reads
+        "limit": 8,
+        "limit_per_host": 4,
+        "keepalive_timeout": 60,
+        "ttl_dns_cache": 300,
+        "connect_timeout": 2,
+        "read_timeout": 120
+    },
+    "cataas": {
+        "limit": 8,
+        "limit_per_host": 4,
+        "keepalive_timeout": 30,
+        "ttl_dns_cache": 300,
+        "connect_timeout": 5,
+        "read_timeout": 15
+    }
+}
+
+DEFAULT_PROFILE = {
+    "limit": 16,
+    "limit_per_host": 8,
+    "keepalive_timeout": 30,
+    "ttl_dns_cache": 300,
+    "connect_timeout": 5,
+    "read_timeout": 30
+}
+
+
+class PoolMetrics:
+    """Counts new vs. reused connections for one pooled client"""
+
+    def __init__(self):
+        self.requests = 0
+        self.in_flight = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def trace_config(self):
+        """Build an aiohttp TraceConfig that feeds these counters"""
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self.requests += 1
+            self.in_flight += 1
+
+        async def on_request_done(session, ctx, params):
+            self.in_flight = max(0, self.in_flight - 1)
+
+        async def on_connection_create_end(session, ctx, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self.connections_reused += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            self.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            self.dns_cache_misses += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_done)
+        trace.on_request_exception.append(on_request_done)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace
+
+    @property
+    def reuse_ratio(self):
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+
+
+class HTTPClientRegistry:
+    """Bot-owned registry of long-lived, pooled aiohttp sessions.
+
+    Sessions are created lazily on first use (inside the running event loop)
+    and shared by every caller of the same profile. Call close() on shutdown.
+    """
+
+    def __init__(self, profiles=None):
+        self.profiles = dict(HTTP_PROFILES)
+        if profiles:
+            self.profiles.update(profiles)
+        self.sessions = {}
+        self.metrics = {}
+
+    def get(self, name):
+        """Return the shared session for a profile, creating it if needed"""
+        session = self.sessions.get(name)
+        if session is not None and not session.closed:
+            return session
+
+        profile = self.profiles.get(name, DEFAULT_PROFILE)
+        connector = aiohttp.TCPConnector(
+            limit=profile["limit"],
+            limit_per_host=profile["limit_per_host"],
+            keepalive_timeout=profile["keepalive_timeout"],
+            use_dns_cache=True,
+            ttl_dns_cache=profile["ttl_dns_cache"]
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=profile["connect_timeout"],
+            sock_read=profile["read_timeout"]
+        )
+        metrics = self.metrics.setdefault(name, PoolMetrics())
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            trace_configs=[metrics.trace_config()]
+        )
+        self.sessions[name] = session
+        logging.info(f"Created pooled HTTP client '{name}' (limit/host: {profile['limit_per_host']})")
+        return session
+
+    def stats(self):
+        """Pool metrics per client: open/idle connections, reuse ratio, DNS cache hits"""
+        result = {}
+        for name, metrics in self.metrics.items():
+            session = self.sessions.get(name)
+            connector = session.connector if session is not None and not session.closed else None
+            # aiohttp keeps no public counters for pooled sockets, so read them defensively
+            idle = sum(len(conns) for conns in getattr(connector, '_conns', {}).values()) if connector else 0
+            acquired = len(getattr(connector, '_acquired', ())) if connector else 0
+            result[name] = {
+                "open_connections": idle + acquired,
+                "idle_connections": idle,
+                "in_flight": metrics.in_flight,
+                "requests": metrics.requests,
+                "connections_created": metrics.connections_created,
+                "connections_reused": metrics.connections_reused,
+                "reuse_ratio": round(metrics.reuse_ratio, 3),
+                "dns_cache_hits": metrics.dns_cache_hits,
+                "dns_cache_misses": metrics.dns_cache_misses
+            }
+        return result
+
+    async def close(self):
+        """Close every pooled session (call once on shutdown)"""
+        for name, session in list(self.sessions.items()):
+            if not session.closed:
+                await session.close()
+                logging.info(f"Closed pooled HTTP client '{name}'")
+        self.sessions.clear()
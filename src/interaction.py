@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import datetime
+
+
+def to_epoch(value):
+    """Epoch seconds from an epoch number or a (legacy) ISO timestamp string"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(datetime.datetime.fromisoformat(value).timestamp())
+
+
+class Interaction:
+    """One stored chatbot exchange.
+
+    Slotted instead of a dict, with an epoch-seconds int instead of an ISO
+    string, so it costs less RAM and displaying history or stats needs no
+    parsing. The owning user isn't stored per record, it's the key of the
+    history/summary the record lives in.
+    """
+
+    __slots__ = ('timestamp', 'user_message', 'bot_response', 'user_tokens', 'bot_tokens')
+
+    def __init__(self, timestamp, user_message, bot_response, user_tokens=None, bot_tokens=None):
+        self.timestamp = timestamp
+        self.user_message = user_message
+        self.bot_response = bot_response
+        self.user_tokens = user_tokens  # Cached for the context builder
+        self.bot_tokens = bot_tokens
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build from a legacy sessions.json / journal entry"""
+        tokens = data.get("tokens") or (None, None)
+        return cls(to_epoch(data["timestamp"]), data["user_message"], data["bot_response"], tokens[0], tokens[1])
+
+    def __repr__(self):
+        return f"Interaction({self.timestamp}, {self.user_message[:20]!r}, {self.bot_response[:20]!r})"
@@ -7,7 +7,8 @@ import psutil
 import platform
 
 # Import AI Chatbot functionality
-from ai_chatbot import register_ai_chatbot_commands, handle_ai_chatbot_message
+from ai_chatbot import register_ai_chatbot_commands, handle_ai_chatbot_message, save_ai_chatbot_stats
+from http_client import HTTPClientRegistry
 
 # Load environment variables
 load_dotenv()
@@ -19,7 +20,16 @@ intents.guilds = True
 intents.members = True
 intents.reactions = True
 
-bot = commands.Bot(command_prefix='!fckr ', intents=intents, help_command=None)
+class FckrBot(commands.Bot):
+    async def close(self):
+        # Flush the AI log sink while the Discord HTTP session is still open
+        await self.ai_log_sink.close()
+        await super().close()
+
+bot = FckrBot(command_prefix='!fckr ', intents=intents, help_command=None)
+
+# Shared, pooled outbound HTTP clients (closed on shutdown)
+bot.http_clients = HTTPClientRegistry()
 
 # Initialize AI Chatbot
 bot.logging_channel = int(os.getenv('BOT_LOGGING', 0))  # Set logging channel for AI chatbot
@@ -27,8 +37,9 @@ register_ai_chatbot_commands(bot)
 
 @bot.event
 async def on_message(message):
-    # Ignore messages from the bot itself
+    # Ignore messages from the bot itself (but remember them for reply detection)
     if message.author == bot.user:
+        bot.bot_message_index.add(message.id)
         return
     
     # Handle AI Chatbot messages (mentions only, no DMs)
@@ -143,7 +154,14 @@ if __name__ == '__main__':
             print('Error: DISCORD_API_TOKEN not found in environment variables')
             exit(1)
         
-        await bot.start(token)
+        try:
+            await bot.start(token)
+        finally:
+            await bot.ai_log_sink.close()  # No-op if bot.close() already flushed it
+            await bot.http_clients.close()
+            await asyncio.to_thread(bot.session_manager.close)
+            save_ai_chatbot_stats(bot)
+            await bot.remove_cog('CountingCog')  # Checkpoints the count ledger
     
     # Run the bot
     asyncio.run(main())
\ No newline at end of file
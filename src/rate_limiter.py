@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import collections
+import math
+import time
+
+GLOBAL_KEY = "__global__"
+EVICT_PER_CHECK = 2  # Idle keys dropped per check (amortized O(1) cleanup)
+
+
+class RatePolicy:
+    """One GCRA (generic cell rate algorithm) limit: `limit` requests per `period` seconds.
+
+    Instead of a list of timestamps, each key only stores its theoretical
+    arrival time (TAT), so checks are O(1) and retry-after values are exact.
+    """
+
+    def __init__(self, name, limit, period, per_user=True):
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.per_user = per_user
+        self.interval = period / limit  # Time one request "costs"
+        self.tats = collections.OrderedDict()  # key -> TAT, oldest update first
+
+    def set_limit(self, limit):
+        """Change the limit in place, existing TATs keep their debt"""
+        self.limit = limit
+        self.interval = self.period / limit
+
+    def key_for(self, user_id):
+        return user_id if self.per_user else GLOBAL_KEY
+
+    def peek(self, key, now):
+        """Returns (allowed, retry_after, new_tat) without recording the request"""
+        tat = max(self.tats.get(key, now), now)
+        new_tat = tat + self.interval
+        allow_at = new_tat - self.period
+        if now < allow_at:
+            return False, allow_at - now, tat
+        return True, 0.0, new_tat
+
+    def commit(self, key, new_tat, now):
+        """Record an allowed request and lazily evict keys that are fully replenished"""
+        self.tats[key] = new_tat
+        self.tats.move_to_end(key)
+        for _ in range(EVICT_PER_CHECK):
+            oldest_key = next(iter(self.tats))
+            if oldest_key == key or self.tats[oldest_key] > now:
+                break
+            del self.tats[oldest_key]
+
+    def remaining(self, key, now):
+        """Requests still available for a key right now"""
+        tat = max(self.tats.get(key, now), now)
+        return max(0, int((self.period - (tat - now)) / self.interval))
+
+
+class RateLimiter:
+    """Checks several policies at once, a request is only counted if all allow it"""
+
+    def __init__(self, policies):
+        self.policies = policies
+
+    def check(self, user_id, now=None):
+        """Returns (allowed, retry_after_seconds, blocking_policy_name)"""
+        now = time.time() if now is None else now
+        decisions = []
+        retry_after = 0.0
+        blocking = None
+        for policy in self.policies:
+            key = policy.key_for(user_id)
+            allowed, wait, new_tat = policy.peek(key, now)
+            if not allowed and wait > retry_after:
+                retry_after = wait
+                blocking = policy.name
+            decisions.append((policy, key, new_tat))
+
+        if blocking:
+            return False, math.ceil(retry_after), blocking
+
+        for policy, key, new_tat in decisions:
+            policy.commit(key, new_tat, now)
+        return True, 0, None
+
+    def tracked_keys(self):
+        """Number of keys currently held in memory per policy"""
+        return {policy.name: len(policy.tats) for policy in self.policies}
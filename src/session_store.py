@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import collections
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+
+from interaction import Interaction, to_epoch
+
+SESSION_HOT_SET_SIZE = int(os.getenv('AI_SESSION_HOT_SET', 1000))  # Users whose history stays in RAM
+
+_STOP = object()  # Queue marker: flush and stop the writer
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    user_message TEXT NOT NULL,
+    bot_response TEXT NOT NULL,
+    user_tokens INTEGER,
+    bot_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS interactions_user ON interactions (user_id, id);
+CREATE TABLE IF NOT EXISTS user_summary (
+    user_id INTEGER PRIMARY KEY,
+    total_messages INTEGER NOT NULL,
+    first_interaction INTEGER NOT NULL,
+    last_interaction INTEGER NOT NULL
+);
+"""
+SCHEMA_VERSION = 1  # 1: epoch-int timestamps (0 stored ISO strings)
+
+
+class SessionStore:
+    """SQLite-backed session store with an LRU-bounded hot set in RAM.
+
+    A user's recent history is loaded from the indexed database on first use
+    and only the most recently active users stay in memory. Writes are queued
+    and committed in batches by a background thread (SQLite's WAL is the
+    append-only journal, its checkpoints the compaction). Per-user counts and
+    first/last timestamps live in a small summary index, so stats for any
+    user never need their history.
+    """
+
+    def __init__(self, db_path, max_history, hot_set_size=SESSION_HOT_SET_SIZE):
+        self.db_path = db_path
+        self.max_history = max_history
+        self.hot_set_size = hot_set_size
+        self.hot = collections.OrderedDict()  # user_id -> deque, least recently used first
+        self.summary = {}  # user_id -> [total_messages, first_interaction, last_interaction] (epoch seconds)
+        self.activity = collections.OrderedDict()  # user_id -> last_interaction, oldest first (expired lazily)
+        self.hits = 0
+        self.misses = 0
+
+        # Users with queued writes must not be evicted before the writer commits them
+        self.unflushed = collections.Counter()
+        self.unflushed_lock = threading.Lock()
+
+        self.db = self._connect()
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+        self._migrate()
+        for user_id, total, first, last in self.db.execute("SELECT user_id, total_messages, first_interaction, last_interaction FROM user_summary ORDER BY last_interaction"):
+            self.summary[user_id] = [total, first, last]
+            self.activity[user_id] = last
+
+        self.queue = queue.Queue()
+        self.writer = threading.Thread(target=self._run, name="session-store", daemon=True)
+        self.writer.start()
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _migrate(self):
+        """Convert ISO timestamp strings from schema version 0 to epoch ints"""
+        if self.db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        with self.db:
+            rows = self.db.execute("SELECT id, timestamp FROM interactions WHERE typeof(timestamp) = 'text'").fetchall()
+            self.db.executemany("UPDATE interactions SET timestamp = ? WHERE id = ?", [(to_epoch(ts), row_id) for row_id, ts in rows])
+            summaries = self.db.execute(
+                "SELECT user_id, first_interaction, last_interaction FROM user_summary "
+                "WHERE typeof(first_interaction) = 'text' OR typeof(last_interaction) = 'text'"
+            ).fetchall()
+            self.db.executemany(
+                "UPDATE user_summary SET first_interaction = ?, last_interaction = ? WHERE user_id = ?",
+                [(to_epoch(first), to_epoch(last), user_id) for user_id, first, last in summaries]
+            )
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        if rows or summaries:
+            logging.info(f"Converted {len(rows)} interaction timestamps to epoch seconds")
+
+    def get_history(self, user_id):
+        """Recent interactions of a user, loaded from disk on first use"""
+        history = self.hot.get(user_id)
+        if history is not None:
+            self.hits += 1
+            self.hot.move_to_end(user_id)
+            return history
+
+        self.misses += 1
+        history = collections.deque(maxlen=self.max_history)
+        if user_id in self.summary:
+            rows = self.db.execute(
+                "SELECT timestamp, user_message, bot_response, user_tokens, bot_tokens FROM interactions "
+                "WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                (user_id, self.max_history)
+            ).fetchall()
+            for row in reversed(rows):
+                history.append(Interaction(*row))
+
+        self.hot[user_id] = history
+        self._evict()
+        return history
+
+    def append(self, user_id, entry):
+        """Add an interaction to the hot set and summary, queue it for the writer (O(1))"""
+        self.get_history(user_id).append(entry)
+
+        summary = self.summary.get(user_id)
+        if summary is None:
+            self.summary[user_id] = [1, entry.timestamp, entry.timestamp]
+        else:
+            summary[0] += 1
+            summary[2] = entry.timestamp
+        self.activity[user_id] = entry.timestamp
+        self.activity.move_to_end(user_id)
+
+        with self.unflushed_lock:
+            self.unflushed[user_id] += 1
+        self.queue.put((user_id, entry))
+
+    def get_summary(self, user_id):
+        """[total_messages, first_interaction, last_interaction] or None"""
+        return self.summary.get(user_id)
+
+    def user_count(self):
+        return len(self.summary)
+
+    def active_count(self, since):
+        """Users whose last interaction is at or after `since` (epoch seconds, must not go backwards).
+
+        Users that went quiet are dropped from the front of the activity order,
+        so each call only touches the ones that expired since the last call.
+        """
+        activity = self.activity
+        while activity:
+            user_id = next(iter(activity))
+            if activity[user_id] >= since:
+                break
+            del activity[user_id]
+        return len(activity)
+
+    def all_interactions(self):
+        """Every stored interaction as (user_id, entry), oldest first (own connection, for backfills)"""
+        db = self._connect()
+        try:
+            for user_id, timestamp, user_message, bot_response in db.execute(
+                    "SELECT user_id, timestamp, user_message, bot_response FROM interactions ORDER BY id"):
+                yield user_id, Interaction(timestamp, user_message, bot_response)
+        finally:
+            db.close()
+
+    def _evict(self):
+        """Drop least recently used histories beyond the hot set size"""
+        checked = 0
+        while len(self.hot) > self.hot_set_size and checked < len(self.hot):
+            user_id = next(iter(self.hot))
+            with self.unflushed_lock:
+                busy = self.unflushed[user_id] > 0
+            if busy:
+                # Still has queued writes, retry on a later eviction
+                self.hot.move_to_end(user_id)
+                checked += 1
+                continue
+            del self.hot[user_id]
+
+    def import_sessions(self, sessions):
+        """Bulk import {user_id: [interaction, ...]} (legacy migration), runs synchronously"""
+        with self.db:
+            for user_id, entries in sessions.items():
+                self._write(self.db, user_id, entries)
+        for user_id, entries in sessions.items():
+            if not entries:
+                continue
+            summary = self.summary.get(user_id)
+            if summary is None:
+                self.summary[user_id] = [len(entries), entries[0].timestamp, entries[-1].timestamp]
+            else:
+                summary[0] += len(entries)
+                summary[2] = entries[-1].timestamp
+            self.hot.pop(user_id, None)
+        # Imported timestamps are older than live ones: restore the activity order once
+        self.activity = collections.OrderedDict(sorted(((user_id, summary[2]) for user_id, summary in self.summary.items()), key=lambda item: item[1]))
+
+    def close(self, timeout=10):
+        """Flush queued writes and stop the writer thread"""
+        if self.writer.is_alive():
+            self.queue.put(_STOP)
+            self.writer.join(timeout)
+
+    def _write(self, db, user_id, entries):
+        if not entries:
+            return
+        db.executemany(
+            "INSERT INTO interactions (user_id, timestamp, user_message, bot_response, user_tokens, bot_tokens) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (user_id, entry.timestamp, entry.user_message, entry.bot_response, entry.user_tokens, entry.bot_tokens)
+                for entry in entries
+            ]
+        )
+        db.execute(
+            "INSERT INTO user_summary (user_id, total_messages, first_interaction, last_interaction) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET total_messages = total_messages + excluded.total_messages, "
+            "last_interaction = excluded.last_interaction",
+            (user_id, len(entries), entries[0].timestamp, entries[-1].timestamp)
+        )
+        # Only the most recent max_history interactions are ever read back
+        db.execute(
+            "DELETE FROM interactions WHERE user_id = ? AND id <= "
+            "(SELECT id FROM interactions WHERE user_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (user_id, user_id, self.max_history)
+        )
+
+    def _run(self):
+        db = self._connect()
+        try:
+            while True:
+                item = self.queue.get()
+                stop = False
+                batch = collections.defaultdict(list)
+                # Drain whatever piled up so a burst costs a single transaction
+                while True:
+                    if item is _STOP:
+                        stop = True
+                    else:
+                        user_id, entry = item
+                        batch[user_id].append(entry)
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                try:
+                    with db:
+                        for user_id, entries in batch.items():
+                            self._write(db, user_id, entries)
+                except Exception as e:
+                    logging.error(f"Error writing sessions: {str(e)}")
+
+                with self.unflushed_lock:
+                    for user_id, entries in batch.items():
+                        self.unflushed[user_id] -= len(entries)
+                        if self.unflushed[user_id] <= 0:
+                            del self.unflushed[user_id]
+                if stop:
+                    return
+        finally:
+            db.close()
+
+
+def load_legacy_sessions(snapshot_path, max_history):
+    """Read the old sessions.json snapshot plus any journal tail, {user_id: [Interaction, ...]}"""
+    sessions = {}
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            for user_id, entries in json.load(f).items():
+                sessions[int(user_id)] = [Interaction.from_dict(entry) for entry in list(entries)[-max_history:]]
+
+    for path in (snapshot_path + '.journal.compacting', snapshot_path + '.journal'):
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                entries = sessions.setdefault(int(record["u"]), [])
+                entry = Interaction.from_dict(record["e"])
+                # Skip records already folded into the snapshot
+                if entries and entries[-1].timestamp >= entry.timestamp:
+                    continue
+                entries.append(entry)
+                if len(entries) > max_history:
+                    del entries[:-max_history]
+    return sessions
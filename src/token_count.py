@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+# Imports
+import re
+
+# Words, numbers and single punctuation/emoji characters
+TOKEN_PIECE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """Cheap token estimate for LLM payloads (no tokenizer dependency).
+
+    Counts word/punctuation pieces and adds one extra token per 6 characters
+    of long words, which tracks BPE tokenizers closely enough for budgeting.
+    """
+    if not text:
+        return 0
+    return sum(1 + len(piece) // 6 for piece in TOKEN_PIECE.findall(text))